@@ -0,0 +1,58 @@
+"""Benchmark response serialization: stdlib json vs. lotto_json's fast path
+
+Times the body of a /biased_spin/batch?encoding=numbers response (one
+ticket per pool entry, the largest JSON the backend emits) and a
+/pool_info/ body, for several pool sizes.
+
+Usage: python bench_json.py [--sizes 1000 100000 1000000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+
+from lotto_engine import generate_pool, pool_frequencies
+from lotto_json import BACKEND, dumps, stdlib_dumps
+from lotto_rng import make_generator
+
+
+def best_of(repeat: int, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_dumps(payload) -> bytes:
+    """What the endpoints did before: convert arrays with tolist(), then stdlib json"""
+    payload = dict(payload, tickets=payload["tickets"].tolist())
+    return json.dumps(payload).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"fast path: {BACKEND}")
+    print(f"{'size':>10} {'payload':>10} {'legacy (ms)':>12} {'stdlib (ms)':>12} {'fast (ms)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        pool = generate_pool(size, make_generator(size))
+        frequencies = pool_frequencies(pool)
+        payloads = {
+            "batch": {"count": size, "encoding": "numbers", "tickets": pool},
+            "pool_info": {"pool_size": size, "number_frequencies": dict(frequencies)}
+        }
+        for name, payload in payloads.items():
+            legacy = legacy_dumps if name == "batch" else (lambda p: json.dumps(p).encode())
+            legacy_time = best_of(args.repeat, legacy, payload)
+            stdlib_time = best_of(args.repeat, stdlib_dumps, payload)
+            fast_time = best_of(args.repeat, dumps, payload)
+            print(f"{size:>10} {name:>10} {legacy_time * 1e3:>12.3f} {stdlib_time * 1e3:>12.3f} "
+                  f"{fast_time * 1e3:>10.3f} {legacy_time / fast_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
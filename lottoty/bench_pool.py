@@ -0,0 +1,59 @@
+"""Benchmark pool generation: legacy random.sample loop vs. the NumPy engine
+
+Usage: python bench_pool.py [--sizes 1000 100000 1000000 8000000] [--legacy-max N] [--workers N]
+"""
+import argparse
+import random
+import time
+from math import comb
+
+from lotto_engine import generate_pool
+from lotto_parallel import build_pool_parallel
+
+
+def legacy_sample(sample_size: int):
+    """The original set-based generator, kept here as the baseline"""
+    sample = set()
+    sample_size = min(sample_size, comb(45, 6))
+    while len(sample) < sample_size:
+        sample.add(tuple(sorted(random.sample(range(1, 46), 6))))
+    return list(sample)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 100_000, 1_000_000, 8_000_000])
+    parser.add_argument("--legacy-max", type=int, default=1_000_000,
+                        help="skip the legacy loop above this size (it takes minutes)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="also time lotto_parallel with this many shards")
+    args = parser.parse_args()
+
+    header = f"{'size':>10} {'legacy (s)':>12} {'numpy (s)':>12} {'speedup':>9}"
+    if args.workers:
+        header += f" {f'parallel x{args.workers} (s)':>18}"
+    print(header)
+    for size in args.sizes:
+        numpy_time, pool = timed(generate_pool, size)
+        assert len(pool) == min(size, comb(45, 6))
+
+        if size <= args.legacy_max:
+            legacy_time, _ = timed(legacy_sample, size)
+            line = f"{size:>10} {legacy_time:>12.3f} {numpy_time:>12.3f} {legacy_time / numpy_time:>8.1f}x"
+        else:
+            line = f"{size:>10} {'skipped':>12} {numpy_time:>12.3f} {'-':>9}"
+        if args.workers:
+            parallel_time, _ = timed(build_pool_parallel, size, args.workers)
+            line += f" {parallel_time:>18.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
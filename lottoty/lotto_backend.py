@@ -1,19 +1,42 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import base64
 import json
 import os
-import random
-from collections import defaultdict, Counter
-from math import comb
+from collections import Counter
+import numpy as np
+from lotto_cache import ResponseCache
+from lotto_cooccur import matrix_payload, pair_counts
+from lotto_drawlog import DrawLog, to_draws, to_timestamp
+from lotto_json import FastJSONResponse, dumps, loads
+from lotto_match import evaluate
+from lotto_export import MEDIA_TYPES, export_chunks
+from lotto_index import PoolIndex, popcount
+from lotto_ingest import RECORD_CHUNK, body_format, draw_error, read_records, record_fields, validate_records
+from lotto_engine import PICK, build_pool, counts_to_frequencies, frequencies_to_counts, pool_frequencies
+from lotto_rank import rank_array
+from lotto_resize import can_resize, resize_pool
+from lotto_rng import BIT_GENERATORS, RngSource, make_generator
+from lotto_sampler import AliasSampler
+from lotto_simulate import run_simulation
+from lotto_parallel import build_pool_parallel
+from lotto_persist import WriteBehind
+from lotto_poolcache import PoolCache
+from lotto_stats import WINDOWS, DrawStats, decayed_weights
+from lotto_store import load_pool, pool_writer
 
 # Create FastAPI app with metadata
 app = FastAPI(
     title="Mega Lotto API",
     description="Backend for lottery number tracking and analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Allow all cross-origin requests
@@ -28,19 +51,65 @@ app.add_middleware(
 
 # Data directory and filenames
 DATA_DIR = "data"
-RECENT_COMBINATIONS_FILE = "recent_combinations.json"
-LUCKY_NUMBERS_FILE = "lucky_numbers.json"
+RECENT_COMBINATIONS_FILE = "recent_combinations.json"  # Legacy, imported into the draw log once
+DRAWS_DIR = "draws"  # Append-only draw log segments, see lotto_drawlog
+LUCKY_NUMBERS_FILE = "lucky_numbers.bin"  # Binary pool, see lotto_store
 CONFIG_FILE = "config.json"
-MAX_RECENT = 10  # Limit for recent draws
-
-# Storage for lucky numbers pool and frequencies
-LUCKY_NUMBERS_POOL = []
+POOL_CACHE_DIR = "pool_cache"  # Pools evicted from the snapshot cache, see lotto_poolcache
+MAX_RECENT = 10  # Default page size for recent draws
+MAX_PAGE = 1000  # Largest page /recent/ and /draws/ will return
+MAX_BATCH_SPINS = 1_000_000  # Upper bound for /biased_spin/batch
+MAX_RECORD_BATCH = 10_000  # Draws per JSON-list /record/batch request; NDJSON and CSV are streamed
+MAX_REPORTED_ERRORS = 1000  # Row errors listed in a /record/batch response
+MAX_SIM_DRAWS = 1_000_000  # Upper bound for /simulate/ draws
+MAX_SIM_TICKETS = 200_000_000  # Upper bound for /simulate/ draws x tickets, per strategy
+FLUSH_INTERVAL = 0.5  # Seconds between write-behind flushes of state files
+POOL_CACHE_BUDGET = 512 * 1024 * 1024  # Bytes of earlier pools kept in memory for switching back
+
+# Storage for lucky numbers pool (packed (N, 6) uint8 array) and frequencies
+LUCKY_NUMBERS_POOL = np.empty((0, PICK), dtype=np.uint8)
 SAMPLE_SIZE = 1000
+POOL_MODE = "uniform"  # "uniform", or "history" to weight combinations by the recorded draws
+HISTORY_DECAY = 0.99  # History mode: each draw counts this much less than the next; 1 weighs all equally
 LUCKY_NUMBERS_FREQUENCIES = Counter()
+LUCKY_SAMPLER = None  # Alias table over LUCKY_NUMBERS_FREQUENCIES
+LUCKY_POOL_PAIRS = None  # Pair co-occurrence over the pool; computed lazily when not supplied
+LUCKY_POOL_INDEX = None  # Per-number bitmaps over pool positions; built with the pool or lazily
+LUCKY_POOL_PRESENT = None  # Which ranks are in the pool, kept up to date across resizes
+LUCKY_POOL_KEY = None  # pool_key() of the current pool; it is cached under this key when replaced
+RNG = RngSource()  # Independent, seedable streams per request and per pool build
+
+# Pool rebuilds run in a worker process; the current pool keeps serving meanwhile
+POOL_EXECUTOR = ProcessPoolExecutor(max_workers=1)
+POOL_WORKERS = os.cpu_count() or 1  # Shards for parallel pool builds; 1 disables them
+PARALLEL_MIN_SAMPLE = 500_000  # Below this, starting shard processes costs more than it saves
+pool_rebuild_task = None
+pool_rebuild_status = {
+    "state": "idle",  # idle | queued | generating | failed
+    "target_sample_size": None,
+    "started": None,
+    "finished": None,
+    "error": None
+}
+
+# Polled endpoints serve pre-serialized bodies until the state behind them changes.
+# Versions: "pool" (set_lucky_pool), "rebuild" (set_rebuild_status),
+# "config" (save_config) and "spin" (update_global_state); /recent/ uses the
+# draw log length, which only grows.
+state_versions = Counter()
+response_cache = ResponseCache()
+current_spin_results = {"numbers": []}
+validated_spin = None  # Spin version /lucky_numbers/ last validated
 
 # Create the data directory if it doesn't exist
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# All state files go through one coalescing, atomic write-behind layer
+persistence = WriteBehind(interval=FLUSH_INTERVAL)
+
+# Earlier pools by configuration, so switching back to one is instant
+pool_cache = PoolCache(POOL_CACHE_BUDGET, f"{DATA_DIR}/{POOL_CACHE_DIR}", spill=persistence.schedule)
+
 # Pydantic model for submitted draw data
 class Draw(BaseModel):
     numbers: List[int]
@@ -49,87 +118,244 @@ class Draw(BaseModel):
 
 class ConfigUpdate(BaseModel):
     sample_size: Optional[int] = None
+    seed: Optional[int] = None  # Send null explicitly to go back to fresh entropy
+    rng: Optional[str] = None  # "pcg64" or "philox"
+    workers: Optional[int] = None  # Parallel build shards; the pool for a seed depends on it
+    mode: Optional[str] = None  # "uniform" or "history"
+    decay: Optional[float] = None  # History mode decay per draw, in (0, 1]
 
 
-# In-memory data for recent draws and number frequencies
-recent_combinations = []
-number_frequencies = defaultdict(int)
+# Every recorded draw lives in the draw log; statistics are replayed from it on startup
+draw_log = DrawLog(f"{DATA_DIR}/{DRAWS_DIR}")
+recent_floor = 0  # /reset/ hides draws with ids below this from /recent/
+draw_stats = DrawStats()
 
 # ------------------------------------------------------
 # Main logic
-def generate_representative_sample(sample_size: int):
-    sample = set()
-    max_possible = comb(45, 6)  # Total possible 6-number combinations from 1-45
-    
-    # Ensure sample size doesn't exceed maximum possible combinations
-    sample_size = min(sample_size, max_possible)
-    
-    while len(sample) < sample_size:
-        combo = tuple(sorted(random.sample(range(1, 46), 6)))
-        sample.add(combo)
-    return list(sample)
-# Initialize the lucky numbers pool with random combinations and calculate their frequencies
+def pool_weights():
+    """Per-number weights from the draw history in history mode, None for uniform pools"""
+    if POOL_MODE != "history":
+        return None
+    return decayed_weights(draw_log.iter_numbers(), len(draw_log), HISTORY_DECAY)
+
+def parallel_build(sample_size: int) -> bool:
+    """Whether the pool at `sample_size` is built in shards, one per worker"""
+    return POOL_MODE == "uniform" and POOL_WORKERS > 1 and sample_size >= PARALLEL_MIN_SAMPLE
+
+def pool_build(sample_size: int, weights):
+    """(executor, function, args) building the pool that pool_key(sample_size) describes.
+
+    Startup calls the function inline; rebuilds run it on the executor.
+    Sharded builds start their own processes, so a thread coordinates them.
+    """
+    seed = RNG.derive(sample_size)
+    if parallel_build(sample_size):
+        return None, build_pool_parallel, (sample_size, POOL_WORKERS, seed, RNG.bit_generator)
+    return POOL_EXECUTOR, build_pool, (sample_size, seed, RNG.bit_generator, weights)
+
+def pool_source():
+    """Everything but the size that decides how the pool is drawn"""
+    return RNG.seed, RNG.bit_generator, POOL_MODE, HISTORY_DECAY
+
+def pool_key(sample_size: int):
+    """Snapshot cache key for the pool the current settings give at `sample_size`"""
+    history = len(draw_log) if POOL_MODE == "history" else None
+    # Shards draw a seeded pool differently; unseeded pools are equally valid either way
+    sharded = RNG.seed is not None and parallel_build(sample_size)
+    return (sample_size, *pool_source(), POOL_WORKERS if sharded else 1, history)
+
+def resizable_to(sample_size: int, weighted: bool) -> bool:
+    """Whether the current pool may be resized to `sample_size` rather than rebuilt.
+
+    A resized pool differs from a fresh build at the same size, so seeded
+    pools are always rebuilt: with a seed, the pool depends only on the
+    configuration, not on the sizes before it. Unseeded, both are equally
+    valid draws and share the cache key.
+    """
+    if RNG.seed is not None or LUCKY_POOL_KEY is None:
+        return False
+    current, target = LUCKY_POOL_KEY, pool_key(sample_size)
+    # Same seed, rng, mode, decay and recorded draws; the worker count only matters for seeded builds
+    same_source = current[1:-2] == target[1:-2] and current[-1] == target[-1]
+    return same_source and can_resize(len(LUCKY_NUMBERS_POOL), sample_size, weighted)
+
+def set_lucky_pool(pool, frequencies=None, pairs=None, index=None, present=None, key=None):
+    """Install a new pool with its frequencies, spin sampler, pair counts and index in one step.
+
+    The pool being replaced goes into the snapshot cache under its key.
+    """
+    global LUCKY_NUMBERS_POOL, LUCKY_NUMBERS_FREQUENCIES, LUCKY_SAMPLER, LUCKY_POOL_PAIRS, LUCKY_POOL_INDEX
+    global LUCKY_POOL_PRESENT, LUCKY_POOL_KEY
+    if frequencies is None:
+        frequencies = pool_frequencies(pool)
+    sampler = AliasSampler(frequencies) if len(pool) else None
+    if LUCKY_POOL_KEY is not None and LUCKY_POOL_KEY != key and len(LUCKY_NUMBERS_POOL):
+        pool_cache.put(LUCKY_POOL_KEY, (
+            LUCKY_NUMBERS_POOL, LUCKY_NUMBERS_FREQUENCIES, LUCKY_POOL_PAIRS, LUCKY_POOL_INDEX, LUCKY_POOL_PRESENT
+        ))
+    # No awaits here, so handlers never observe a half-swapped pool
+    (LUCKY_NUMBERS_POOL, LUCKY_NUMBERS_FREQUENCIES, LUCKY_SAMPLER, LUCKY_POOL_PAIRS, LUCKY_POOL_INDEX,
+     LUCKY_POOL_PRESENT, LUCKY_POOL_KEY) = (
+        pool, frequencies, sampler, pairs, index, present, key
+    )
+    state_versions["pool"] += 1
+
+def set_rebuild_status(**fields):
+    pool_rebuild_status.update(**fields)
+    state_versions["rebuild"] += 1
+
+def load_config():
+    """Read sample size, RNG settings and the recent-draws reset point, if saved"""
+    global SAMPLE_SIZE, recent_floor, POOL_WORKERS, POOL_MODE, HISTORY_DECAY
+    if os.path.exists(f"{DATA_DIR}/{CONFIG_FILE}"):
+        with open(f"{DATA_DIR}/{CONFIG_FILE}", "r") as f:
+            config = json.load(f)
+        SAMPLE_SIZE = config.get("sample_size", 1000)
+        recent_floor = config.get("recent_floor", 0)
+        POOL_WORKERS = config.get("workers", POOL_WORKERS)
+        POOL_MODE = config.get("mode", POOL_MODE)
+        HISTORY_DECAY = config.get("decay", HISTORY_DECAY)
+        RNG.configure(config.get("seed"), config.get("rng", "pcg64"))
+
+# Initialize the lucky numbers pool, reusing the saved pool when it matches the config
 def initialize_lucky_numbers():
     """Initialize or reinitialize the lucky numbers pool"""
-    global LUCKY_NUMBERS_POOL, LUCKY_NUMBERS_FREQUENCIES, SAMPLE_SIZE
     try:
-        # Try to load config if exists
-        if os.path.exists(f"{DATA_DIR}/{CONFIG_FILE}"):
-            with open(f"{DATA_DIR}/{CONFIG_FILE}", "r") as f:
-                config = json.load(f)
-                SAMPLE_SIZE = config.get("sample_size", 1000)
-        
-        LUCKY_NUMBERS_POOL = generate_representative_sample(SAMPLE_SIZE)
-        flat_numbers = [num for combo in LUCKY_NUMBERS_POOL for num in combo]
-        LUCKY_NUMBERS_FREQUENCIES = Counter(flat_numbers)
+        load_config()
+        saved = load_pool(f"{DATA_DIR}/{LUCKY_NUMBERS_FILE}")
+        # The config can be saved ahead of the pool; only a pool drawn with it is reused
+        if saved is not None and saved[3] == pool_key(SAMPLE_SIZE):
+            pool, frequencies, _, key = saved
+            # Copied out of the mapping: Windows can't replace a mapped file when the pool is saved again
+            set_lucky_pool(np.array(pool), frequencies, key=key)
+        else:
+            _, build, args = pool_build(SAMPLE_SIZE, pool_weights())
+            pool, frequencies, pairs = build(*args)
+            set_lucky_pool(pool, frequencies, pairs, key=pool_key(SAMPLE_SIZE))
+            save_lucky_numbers()
     except Exception as e:
         print(f"Error initializing lucky numbers: {e}")
-        LUCKY_NUMBERS_POOL = []
-        LUCKY_NUMBERS_FREQUENCIES = Counter()
+        set_lucky_pool(np.empty((0, PICK), dtype=np.uint8))
         raise
 
-# Generate a new pool and save to file
-def generate_new_lucky_pool(sample_size: int = None):
-    """Generate a new pool with customizable sample size"""
-    global LUCKY_NUMBERS_POOL, LUCKY_NUMBERS_FREQUENCIES, SAMPLE_SIZE
-    
-    if sample_size is not None:
-        SAMPLE_SIZE = sample_size
-        # Save the new sample size to config
-        with open(f"{DATA_DIR}/{CONFIG_FILE}", "w") as f:
-            json.dump({"sample_size": SAMPLE_SIZE}, f)
-    
-    print(f"Generating new lucky numbers pool with sample size {SAMPLE_SIZE}...")
-    LUCKY_NUMBERS_POOL = generate_representative_sample(SAMPLE_SIZE)
-    flat_numbers = [num for combo in LUCKY_NUMBERS_POOL for num in combo]
-    LUCKY_NUMBERS_FREQUENCIES = Counter(flat_numbers)
-    save_lucky_numbers()
+async def resize_lucky_pool(sample_size: int, weights):
+    """Grow or shrink the current pool in place of a rebuild; cost follows the size change"""
+    loop = asyncio.get_running_loop()
+    pool = LUCKY_NUMBERS_POOL
+    print(f"Resizing lucky numbers pool from {len(pool)} to {sample_size}...")
+    rng = make_generator(RNG.derive(len(pool), sample_size), RNG.bit_generator)
+    pool, counts, pairs, present = await loop.run_in_executor(
+        None, resize_pool, pool, frequencies_to_counts(LUCKY_NUMBERS_FREQUENCIES),
+        LUCKY_POOL_PAIRS, LUCKY_POOL_PRESENT, sample_size, rng, weights
+    )
+    # The index is rebuilt lazily on the next query rather than per resize
+    set_lucky_pool(pool, counts_to_frequencies(counts), pairs, present=present, key=pool_key(sample_size))
+
+async def rebuild_lucky_pool(sample_size: int):
+    """Build a new pool in the worker process, then swap it in atomically.
+
+    A pool cached for the same configuration is swapped back in directly, and
+    when only the size changed and not by much, an unseeded pool is resized.
+    """
+    loop = asyncio.get_running_loop()
+    set_rebuild_status(
+        state="generating",
+        target_sample_size=sample_size,
+        started=datetime.now().isoformat(),
+        finished=None,
+        error=None
+    )
+    try:
+        key = pool_key(sample_size)
+        if key == LUCKY_POOL_KEY and len(LUCKY_NUMBERS_POOL):
+            # The current pool is already the one these settings give
+            set_rebuild_status(state="idle", finished=datetime.now().isoformat())
+            return
+        snapshot = pool_cache.get(key)
+        if snapshot is not None:
+            print(f"Restoring cached lucky numbers pool with sample size {sample_size}")
+            set_lucky_pool(*snapshot, key=key)
+            save_lucky_numbers()
+            set_rebuild_status(state="idle", finished=datetime.now().isoformat())
+            return
+
+        weights = await loop.run_in_executor(None, pool_weights)
+        if resizable_to(sample_size, weights is not None):
+            await resize_lucky_pool(sample_size, weights)
+            save_lucky_numbers()
+            set_rebuild_status(state="idle", finished=datetime.now().isoformat())
+            return
+
+        print(f"Rebuilding lucky numbers pool with sample size {sample_size}...")
+        executor, build, args = pool_build(sample_size, weights)
+        pool, frequencies, pairs = await loop.run_in_executor(executor, build, *args)
+        index = await loop.run_in_executor(None, PoolIndex.build, pool)
+        set_lucky_pool(pool, frequencies, pairs, index, key=key)
+        save_lucky_numbers()
+        set_rebuild_status(state="idle", finished=datetime.now().isoformat())
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Error rebuilding lucky numbers: {e}")
+        set_rebuild_status(state="failed", error=str(e), finished=datetime.now().isoformat())
+
+def schedule_pool_rebuild(sample_size: int):
+    """Start a background rebuild, superseding any rebuild still in flight"""
+    global pool_rebuild_task
+    if pool_rebuild_task is not None and not pool_rebuild_task.done():
+        pool_rebuild_task.cancel()
+    set_rebuild_status(state="queued", target_sample_size=sample_size)
+    pool_rebuild_task = asyncio.create_task(rebuild_lucky_pool(sample_size))
+
+def save_config():
+    """Persist sample size, RNG and worker settings and the recent-draws reset point"""
+    state_versions["config"] += 1
+    persistence.schedule(
+        f"{DATA_DIR}/{CONFIG_FILE}",
+        lambda: dumps({
+            "sample_size": SAMPLE_SIZE,
+            "recent_floor": recent_floor,
+            "workers": POOL_WORKERS,
+            "mode": POOL_MODE,
+            "decay": HISTORY_DECAY,
+            **RNG.config()
+        })
+    )
 
 def save_lucky_numbers():
-    """Save lucky pool and frequencies to JSON"""
+    """Save the current lucky pool and frequencies to the binary pool file"""
+    persistence.schedule(
+        f"{DATA_DIR}/{LUCKY_NUMBERS_FILE}",
+        lambda: pool_writer(LUCKY_NUMBERS_POOL, LUCKY_NUMBERS_FREQUENCIES, SAMPLE_SIZE, LUCKY_POOL_KEY)
+    )
+
+def import_legacy_recent():
+    """Move draws from the old recent_combinations.json into an empty draw log"""
+    path = f"{DATA_DIR}/{RECENT_COMBINATIONS_FILE}"
+    if len(draw_log) or not os.path.exists(path):
+        return
     try:
-        data = {
-            "pool": [list(combo) for combo in LUCKY_NUMBERS_POOL],
-            "frequencies": dict(LUCKY_NUMBERS_FREQUENCIES),
-            "sample_size": SAMPLE_SIZE
-        }
-        with open(f"{DATA_DIR}/{LUCKY_NUMBERS_FILE}", "w") as f:
-            json.dump(data, f)
+        with open(path, "r") as f:
+            for draw in json.load(f):
+                draw_log.append(draw["numbers"], datetime.fromisoformat(draw["draw_date"]))
     except Exception as e:
-        print(f"Error saving lucky numbers: {e}")
+        print(f"Error importing {RECENT_COMBINATIONS_FILE}: {e}")
 
-# Load necessary data (currently only initializes lucky pool)
+# Load the lucky pool, draw history and frequencies
 def load_data():
-    global recent_combinations, number_frequencies
     initialize_lucky_numbers()
+    import_legacy_recent()
+    for numbers in draw_log.iter_numbers():
+        draw_stats.add_many(numbers)
 
 # Load data on startup
 load_data()
 
-# Save recent draws
-def save_data():
-    with open(f"{DATA_DIR}/{RECENT_COMBINATIONS_FILE}", "w") as f:
-        json.dump(recent_combinations[-MAX_RECENT:], f)
+def parse_draw_date(value: str, field: str = "draw_date") -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"{field} must be an ISO 8601 date")
 
 # ------------------------------------------------------
 # API Routes
@@ -149,83 +375,341 @@ async def root():
 
 @app.post("/config/", status_code=200)
 async def update_config(config: ConfigUpdate):
-    """Update configuration including sample size"""
+    """Update sample size, RNG settings and pool mode; the pool rebuilds in the background.
+
+    The pool is a function of (sample_size, seed, rng, mode, decay), so
+    changing any of them rebuilds it. With a fixed seed, spins and pools
+    replay identically (history pools also depend on the recorded draws).
+    """
+    global SAMPLE_SIZE, POOL_WORKERS, POOL_MODE, HISTORY_DECAY
+    # Validate everything before changing anything
+    if config.sample_size is not None and config.sample_size < 1:
+        raise HTTPException(status_code=400, detail="Sample size must be at least 1")
+    if config.mode is not None and config.mode not in ("uniform", "history"):
+        raise HTTPException(status_code=400, detail="Mode must be 'uniform' or 'history'")
+    if config.decay is not None and not 0 < config.decay <= 1:
+        raise HTTPException(status_code=400, detail="Decay must be in (0, 1]")
+    if config.workers is not None and config.workers < 1:
+        raise HTTPException(status_code=400, detail="Workers must be at least 1")
+    if config.seed is not None and config.seed < 0:
+        raise HTTPException(status_code=400, detail="Seed must be non-negative")
+    if config.rng is not None and config.rng not in BIT_GENERATORS:
+        raise HTTPException(status_code=400, detail=f"rng must be one of {sorted(BIT_GENERATORS)}")
+
+    rebuild = False
+    if config.workers is not None:
+        POOL_WORKERS = config.workers
+        save_config()
+        # Seeded sharded pools depend on the worker count
+        rebuild = pool_key(SAMPLE_SIZE) != LUCKY_POOL_KEY
+    if "seed" in config.model_fields_set or config.rng is not None:
+        seed = config.seed if "seed" in config.model_fields_set else RNG.seed
+        RNG.configure(seed, config.rng or RNG.bit_generator)
+        rebuild = True
     if config.sample_size is not None:
-        if config.sample_size < 1:
-            raise HTTPException(status_code=400, detail="Sample size must be at least 1")
-        generate_new_lucky_pool(config.sample_size)
-    return {"message": "Configuration updated successfully", "sample_size": SAMPLE_SIZE}
+        SAMPLE_SIZE = config.sample_size
+        rebuild = True
+    if config.mode is not None or config.decay is not None:
+        POOL_MODE = config.mode or POOL_MODE
+        HISTORY_DECAY = config.decay if config.decay is not None else HISTORY_DECAY
+        rebuild = True
+
+    if rebuild:
+        save_config()
+        schedule_pool_rebuild(SAMPLE_SIZE)
+    return {
+        "message": "Configuration updated successfully",
+        "sample_size": SAMPLE_SIZE,
+        "workers": POOL_WORKERS,
+        "mode": POOL_MODE,
+        "decay": HISTORY_DECAY,
+        **RNG.config(),
+        "rebuild": pool_rebuild_status["state"]
+    }
 
 @app.get("/config/", status_code=200)
-async def get_config():
+async def get_config(request: Request):
     """Get current configuration"""
-    return {"sample_size": SAMPLE_SIZE}
+    return response_cache.respond(
+        request, "config", state_versions["config"],
+        lambda: {
+            "sample_size": SAMPLE_SIZE,
+            "workers": POOL_WORKERS,
+            "mode": POOL_MODE,
+            "decay": HISTORY_DECAY,
+            **RNG.config()
+        }
+    )
 
 @app.get("/pool_info/", status_code=200)
-async def get_pool_info():
+async def get_pool_info(request: Request):
     """Get information about the current lucky numbers pool"""
-    return {
-        "pool_size": len(LUCKY_NUMBERS_POOL),
-        "sample_size": SAMPLE_SIZE,
-        "number_frequencies": dict(LUCKY_NUMBERS_FREQUENCIES)
-    }
+    def build():
+        rebuild = dict(pool_rebuild_status)
+        if rebuild["state"] == "generating":
+            started = datetime.fromisoformat(rebuild["started"])
+            rebuild["elapsed_seconds"] = round((datetime.now() - started).total_seconds(), 3)
+        return {
+            "pool_size": len(LUCKY_NUMBERS_POOL),
+            "sample_size": SAMPLE_SIZE,
+            "mode": POOL_MODE,
+            "number_frequencies": dict(LUCKY_NUMBERS_FREQUENCIES),
+            "rebuild": rebuild,
+            "cache": pool_cache.stats()
+        }
+
+    # elapsed_seconds ticks while generating, so that state is never cached
+    version = (state_versions["pool"], state_versions["rebuild"], state_versions["config"], pool_cache.version)
+    if pool_rebuild_status["state"] == "generating":
+        version = None
+    return response_cache.respond(request, "pool_info", version, build)
+
+# Stream the pool itself http://127.0.0.1:8000/pool/export?format=csv&contains=7&contains=23
+@app.get("/pool/export")
+async def export_pool(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|binary)$"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    contains: List[int] = Query([])
+):
+    """Stream pool combinations in chunks, in pool order.
+
+    offset/limit select a range of pool positions; `contains` (repeatable)
+    keeps only combinations holding every given number. The binary format
+    is 6 uint8 numbers per combination. The pool being exported is fixed
+    when the request starts, so a rebuild mid-download doesn't mix pools.
+    """
+    if any(n < 1 or n > 45 for n in contains):
+        raise HTTPException(status_code=400, detail="Numbers must be between 1 and 45")
+    pool = LUCKY_NUMBERS_POOL
+    return StreamingResponse(
+        export_chunks(pool, format, offset, limit, sorted(set(contains))),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=lucky_pool.{'bin' if format == 'binary' else format}",
+            "X-Pool-Size": str(len(pool))
+        }
+    )
 
 # Record a new lottery draw
 @app.post("/record/", status_code=201)
 async def record_combination(draw: Draw):
-    if len(draw.numbers) != 6:
-        raise HTTPException(status_code=400, detail="Exactly 6 numbers required")
-    if any(n < 1 or n > 45 for n in draw.numbers):
-        raise HTTPException(status_code=400, detail="Numbers must be between 1 and 45")
+    error = draw_error(draw.numbers)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
     if not draw.draw_date:
         draw.draw_date = datetime.now().isoformat()
 
-    recent_combinations.append({
-        "numbers": draw.numbers,
-        "draw_date": draw.draw_date
-    })
-    for number in draw.numbers:
-        number_frequencies[number] += 1
-    if len(recent_combinations) > MAX_RECENT:
-        recent_combinations.pop(0)
-
-    save_data()
+    draw_log.append(draw.numbers, parse_draw_date(draw.draw_date))
+    draw_stats.add(draw.numbers)
+
+def record_chunk(records: list, first_row: int, now: datetime, result: dict):
+    """Validate a chunk of parsed records, append its valid draws in one write and tally `result`"""
+    numbers, dates, errors = validate_records(records, now)
+    if len(numbers):
+        draw_log.append_many(numbers, dates)
+        draw_stats.add_many(numbers)
+    result["recorded"] += len(numbers)
+    result["rejected"] += len(errors)
+    room = MAX_REPORTED_ERRORS - len(result["errors"])
+    result["errors"].extend({"row": first_row + i, "error": error} for i, error in errors[:max(room, 0)])
+
+# Record many draws in one request: the frontend's offline outbox, or historical results
+# curl -X POST http://127.0.0.1:8000/record/batch -H "Content-Type: text/csv" --data-binary @draws.csv
+@app.post("/record/batch")
+async def record_batch(request: Request):
+    """Record a JSON list, NDJSON or CSV body of draws; invalid rows are skipped and reported by index.
+
+    Rows are counted from 0, skipping blank lines and a CSV header. NDJSON
+    and CSV bodies are streamed and committed RECORD_CHUNK rows at a time.
+    """
+    fmt = body_format(request.headers.get("content-type"))
+    now = datetime.now()
+    result = {"recorded": 0, "rejected": 0, "errors": []}
+    if fmt != "json":
+        row = 0
+        async for records in read_records(request.stream(), fmt):
+            record_chunk(records, row, now, result)
+            row += len(records)
+        return result
 
-# Get up to 10 recent combinations
+    try:
+        records = loads(await request.body())
+    except ValueError:
+        records = None
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON list of draws")
+    if len(records) > MAX_RECORD_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_RECORD_BATCH} draws per JSON batch; send NDJSON or CSV")
+    for start in range(0, len(records), RECORD_CHUNK):
+        record_chunk([record_fields(r) for r in records[start:start + RECORD_CHUNK]], start, now, result)
+    return result
+
+# Get recent combinations, newest page first: offset counts back from the latest draw
 @app.get("/recent/", response_model=List[Dict])
-async def get_recent_combinations():
-    return recent_combinations[-MAX_RECENT:]
+async def get_recent_combinations(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(MAX_RECENT, ge=1, le=MAX_PAGE)
+):
+    total = len(draw_log)
+    stop = total - offset
+    start = max(stop - limit, recent_floor)
+    return response_cache.respond(
+        request, ("recent", offset, limit), (total, recent_floor),
+        lambda: to_draws(draw_log.read(start, stop)) if start < stop else []
+    )
+
+# Query the full history by draw date http://127.0.0.1:8000/draws/?start=2025-01-01&end=2025-02-01
+@app.get("/draws/")
+async def get_draws(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE)
+):
+    """Draws with start <= draw_date < end, oldest first, paginated"""
+    start_ts = to_timestamp(parse_draw_date(start, "start")) if start else None
+    end_ts = to_timestamp(parse_draw_date(end, "end")) if end else None
+    ids, records = draw_log.query_dates(start_ts, end_ts, offset, limit)
+    draws = to_draws(records)
+    for draw_id, draw in zip(ids.tolist(), draws):
+        draw["id"] = draw_id
+    return {"total_draws": len(draw_log), "offset": offset, "draws": draws}
+
+# Precomputed draw statistics http://127.0.0.1:8000/stats/?top=10&hot=5
+@app.get("/stats/")
+async def get_stats(
+    top: int = Query(10, ge=1, le=100),
+    hot: int = Query(5, ge=1, le=45)
+):
+    """Per-number frequency and gaps, top pairs/triples and hot/cold numbers per window"""
+    return {
+        "total_draws": draw_stats.total,
+        "numbers": draw_stats.number_stats(),
+        "top_pairs": draw_stats.top_pairs(top),
+        "top_triples": draw_stats.top_triples(top),
+        "windows": {str(w): draw_stats.hot_cold(w, hot) for w in WINDOWS}
+    }
+
+async def lucky_pool_pairs():
+    """Pair counts for the current pool, computed off the event loop on first use"""
+    global LUCKY_POOL_PAIRS
+    if LUCKY_POOL_PAIRS is None:
+        pool = LUCKY_NUMBERS_POOL
+        pairs = await asyncio.get_running_loop().run_in_executor(None, pair_counts, pool)
+        # Only cache it if the pool wasn't swapped while counting
+        if pool is LUCKY_NUMBERS_POOL:
+            LUCKY_POOL_PAIRS = pairs
+        return pairs
+    return LUCKY_POOL_PAIRS
+
+async def lucky_pool_index():
+    """(pool, index) for the current pool; pools loaded from disk are indexed on first use"""
+    global LUCKY_POOL_INDEX
+    pool, index = LUCKY_NUMBERS_POOL, LUCKY_POOL_INDEX
+    if index is None:
+        index = await asyncio.get_running_loop().run_in_executor(None, PoolIndex.build, pool)
+        if pool is LUCKY_NUMBERS_POOL:
+            LUCKY_POOL_INDEX = index
+    return pool, index
+
+# Filter the pool by number http://127.0.0.1:8000/pool/query?include=7&include=23&exclude=5
+@app.get("/pool/query")
+async def query_pool(
+    include: List[int] = Query([]),
+    exclude: List[int] = Query([]),
+    mode: str = Query("combinations", pattern="^(count|combinations)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE)
+):
+    """Pool combinations holding every `include` number and no `exclude` number.
+
+    "count" mode only returns how many match; "combinations" also returns a
+    page of matches (in pool order) with their pool positions.
+    """
+    if any(n < 1 or n > 45 for n in include + exclude):
+        raise HTTPException(status_code=400, detail="Numbers must be between 1 and 45")
+    pool, index = await lucky_pool_index()
+    include, exclude = sorted(set(include)), sorted(set(exclude))
+    mask = index.mask(include, exclude)
+    result = {
+        "pool_size": index.size,
+        "include": include,
+        "exclude": exclude,
+        "count": popcount(mask)
+    }
+    if mode == "combinations":
+        positions = PoolIndex.positions(mask, offset, limit)
+        result.update(offset=offset, positions=positions, combinations=pool[positions])
+    return FastJSONResponse(result)
+
+# Check every pool ticket against a draw http://127.0.0.1:8000/pool/match?numbers=3&numbers=9&numbers=17&numbers=22&numbers=31&numbers=44
+@app.get("/pool/match")
+async def match_pool(
+    numbers: List[int] = Query(...),
+    min_hits: int = Query(3, ge=0, le=6),
+    limit: int = Query(100, ge=0, le=MAX_PAGE)
+):
+    """Hit histogram (0-6), prize tier counts and the pool tickets with at least `min_hits` matches"""
+    error = draw_error(numbers)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    pool = LUCKY_NUMBERS_POOL
+    result = await asyncio.get_running_loop().run_in_executor(None, evaluate, pool, numbers, min_hits, limit)
+    return FastJSONResponse({
+        "numbers": sorted(numbers),
+        "tickets": result["tickets"],
+        "histogram": result["histogram"],
+        "tiers": result["tiers"],
+        "total_winners": result["total_winners"],
+        "winners": [
+            {"position": int(position), "numbers": pool[position], "hits": int(hits)}
+            for position, hits in zip(result["winners"], result["winner_hits"])
+        ]
+    })
+
+# 45x45 pair co-occurrence http://127.0.0.1:8000/cooccurrence/?source=draws&format=binary
+@app.get("/cooccurrence/")
+async def get_cooccurrence(
+    source: str = Query("pool", pattern="^(pool|draws)$"),
+    format: str = Query("json", pattern="^(json|binary)$")
+):
+    """How often each pair of numbers appears together in the lucky pool or the recorded draws.
+
+    The binary format is 45*45 little-endian uint32, row-major, numbers 1..45
+    on both axes; the total is sent in the X-Total-Combinations header.
+    """
+    if source == "pool":
+        matrix, total = await lucky_pool_pairs(), len(LUCKY_NUMBERS_POOL)
+    else:
+        matrix, total = draw_stats.pairs, draw_stats.total
+    payload = matrix_payload(matrix)
+
+    if format == "binary":
+        return Response(
+            content=payload.tobytes(),
+            media_type="application/octet-stream",
+            headers={"X-Total-Combinations": str(total)}
+        )
+    return FastJSONResponse({"source": source, "total": total, "matrix": payload})
 
 # Save current spin result to JSON
 def save_current_state():
-    with open(f"{DATA_DIR}/current_results.json", "w") as f:
-        json.dump(current_spin_results, f)
+    persistence.schedule(
+        f"{DATA_DIR}/current_results.json",
+        lambda: dumps(current_spin_results)
+    )
 
 # Fetch the lucky numbers with the highest appearances
 @app.get("/biased_spin/")
 async def biased_spin():
     try:
-        if not LUCKY_NUMBERS_POOL:
+        if len(LUCKY_NUMBERS_POOL) == 0:
             initialize_lucky_numbers()
         
-        # Create weighted pool from lucky frequencies
-        weighted_pool = []
-        for num, freq in LUCKY_NUMBERS_FREQUENCIES.items():
-            weighted_pool.extend([num] * freq)
-
-        spin_result = []
-        attempts = 0
-        while len(spin_result) < 6 and attempts < 100:
-            num = random.choice(weighted_pool)
-            if num not in spin_result:
-                spin_result.append(num)
-            attempts += 1
-
-        if len(spin_result) < 6:
-            spin_result.extend(random.sample(
-                [n for n in range(1, 46) if n not in spin_result],
-                6 - len(spin_result)
-            ))
+        # Weighted draw of 6 distinct numbers from the precomputed alias table
+        spin_result = LUCKY_SAMPLER.spin(RNG.generator())
 
         update_global_state(
             numbers=spin_result,
@@ -233,11 +717,56 @@ async def biased_spin():
             full_frequencies=dict(LUCKY_NUMBERS_FREQUENCIES),
             source="lucky_pool"
         )
-        return current_spin_results
+        return FastJSONResponse(current_spin_results)
 
     except Exception as e:
         raise HTTPException(500, detail=f"Spin failed: {str(e)}")
 
+# Draw many biased tickets in one vectorized pass http://127.0.0.1:8000/biased_spin/batch?count=1000&seed=42
+@app.get("/biased_spin/batch")
+async def biased_spin_batch(
+    count: int = Query(1000, ge=1, le=MAX_BATCH_SPINS),
+    seed: Optional[int] = Query(None, ge=0),
+    encoding: str = Query("packed", pattern="^(packed|ranks|numbers)$")
+):
+    """Draw `count` tickets at once.
+
+    Encodings: "packed" is base64 of count*6 uint8 numbers (row-major, each
+    ticket sorted), "ranks" is one combination rank per ticket, "numbers" is
+    plain lists. Passing a seed makes the batch reproducible.
+    """
+    try:
+        if len(LUCKY_NUMBERS_POOL) == 0:
+            initialize_lucky_numbers()
+
+        tickets = LUCKY_SAMPLER.spin_batch(count, RNG.generator(seed))
+
+        if encoding == "packed":
+            encoded = base64.b64encode(tickets.tobytes()).decode("ascii")
+        elif encoding == "ranks":
+            encoded = rank_array(tickets)
+        else:
+            encoded = tickets  # Serialized straight from the array
+
+        # Persist once per batch: the last ticket becomes the current spin
+        last = tickets[-1].tolist()
+        update_global_state(
+            numbers=last,
+            frequencies={num: LUCKY_NUMBERS_FREQUENCIES[num] for num in last},
+            full_frequencies=dict(LUCKY_NUMBERS_FREQUENCIES),
+            source="lucky_pool_batch"
+        )
+        return FastJSONResponse({
+            "count": count,
+            "seed": seed,
+            "encoding": encoding,
+            "tickets": encoded,
+            "generation_time": current_spin_results["generation_time"]
+        })
+
+    except Exception as e:
+        raise HTTPException(500, detail=f"Batch spin failed: {str(e)}")
+
 # Update global spin result and save
 def update_global_state(numbers, frequencies, full_frequencies, source):
     global current_spin_results
@@ -248,41 +777,93 @@ def update_global_state(numbers, frequencies, full_frequencies, source):
         "source": source,
         "lucky_pool_frequencies": full_frequencies
     }
+    state_versions["spin"] += 1
     save_current_state()
 
+# Backtest biased vs uniform tickets http://127.0.0.1:8000/simulate/?draws=10000&tickets=100&source=recorded
+@app.get("/simulate/")
+async def simulate(
+    draws: int = Query(1000, ge=1, le=MAX_SIM_DRAWS),
+    tickets: int = Query(100, ge=1, le=MAX_SIM_TICKETS),
+    source: str = Query("synthetic", pattern="^(synthetic|recorded)$"),
+    seed: Optional[int] = Query(None, ge=0),
+    workers: Optional[int] = Query(None, ge=1)
+):
+    """Play `tickets` biased and uniform tickets against each of `draws` winning draws.
+
+    Synthetic draws are uniform; "recorded" replays the latest `draws`
+    recorded ones. Streams NDJSON: one line of cumulative 0-6 hit counts per
+    strategy after each completed batch, the last with "done": true.
+    """
+    if draws * tickets > MAX_SIM_TICKETS:
+        raise HTTPException(status_code=400, detail=f"draws * tickets must be at most {MAX_SIM_TICKETS}")
+    if not LUCKY_NUMBERS_FREQUENCIES:
+        raise HTTPException(status_code=409, detail="The lucky pool is empty")
+    recorded = None
+    if source == "recorded":
+        if not len(draw_log):
+            raise HTTPException(status_code=409, detail="No recorded draws")
+        recorded = draw_log.read(len(draw_log) - draws, len(draw_log))["numbers"]
+
+    updates = run_simulation(
+        draws, tickets, dict(LUCKY_NUMBERS_FREQUENCIES), recorded,
+        workers or POOL_WORKERS, seed if seed is not None else RNG.spawn()[0], RNG.bit_generator
+    )
+    return StreamingResponse(
+        (dumps(update) + b"\n" for update in updates),
+        media_type="application/x-ndjson"
+    )
+
 # Reset recent combinations http://127.0.0.1:8000/reset/?reset_recent=true
 @app.get("/reset/")
 async def reset_data(reset_recent: bool = True):
-    global recent_combinations
+    global recent_floor
 
+    # The draw log is append-only, so a reset only hides older draws from /recent/
     if reset_recent:
-        recent_combinations = []
-        with open(f"{DATA_DIR}/{RECENT_COMBINATIONS_FILE}", "w") as f:
-            json.dump([], f)
+        recent_floor = len(draw_log)
+        save_config()
 
     return {"message": "Data reset successfully"}
 
 # Get cached lucky spin or perform new one
 @app.get("/lucky_numbers/")
-async def lucky_numbers():
+async def lucky_numbers(request: Request):
+    global validated_spin
     try:
         if not current_spin_results["numbers"]:
-            return await biased_spin()
-
-        # Validate current results match stored lucky frequencies
-        valid_numbers = all(
-            current_spin_results["frequencies"][num] ==
-            current_spin_results["lucky_pool_frequencies"].get(num, 0)
-            for num in current_spin_results["numbers"]
+            await biased_spin()
+
+        # Validate current results match stored lucky frequencies, once per spin
+        if validated_spin != state_versions["spin"]:
+            valid_numbers = all(
+                current_spin_results["frequencies"][num] ==
+                current_spin_results["lucky_pool_frequencies"].get(num, 0)
+                for num in current_spin_results["numbers"]
+            )
+            if not valid_numbers:
+                await biased_spin()
+            validated_spin = state_versions["spin"]
+
+        return response_cache.respond(
+            request, "lucky_numbers", state_versions["spin"], lambda: current_spin_results
         )
-        if not valid_numbers:
-            return await biased_spin()
-
-        return current_spin_results
 
     except Exception as e:
         raise HTTPException(500, detail=str(e))
 
+# Write-behind counters http://127.0.0.1:8000/persistence/
+@app.get("/persistence/", status_code=200)
+async def get_persistence_stats():
+    """Pending writes, coalesced updates and flush latency of the state files"""
+    return persistence.stats()
+
+@app.on_event("shutdown")
+async def shutdown():
+    POOL_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    await persistence.stop()
+    draw_log.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,56 @@
+"""Pre-serialized response cache with ETag / If-None-Match support"""
+import hashlib
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from lotto_json import dumps
+
+
+class ResponseCache:
+    """Response bodies cached per endpoint key, valid while the state version is unchanged.
+
+    Callers pass a version that changes whenever the state behind the
+    response changes; the payload is only rebuilt and serialized when it
+    does. A version of None means the state is changing continuously: the
+    body is rebuilt every time and not stored. The ETag is a hash of the
+    body, so it stays correct even though version counters restart with
+    the process.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def respond(self, request: Request, key, version, build) -> Response:
+        entry = self._entries.get(key)
+        if version is not None and entry is not None and entry[0] == version:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            body = dumps(build())
+            etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+            entry = (version, body, etag)
+            if version is not None:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        _, body, etag = entry
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison)"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
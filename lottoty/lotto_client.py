@@ -0,0 +1,319 @@
+"""Background HTTP client for the Tk frontend
+
+Requests run on worker threads over one keep-alive requests.Session, so the
+Tk main loop never waits on the network. Finished responses are queued and
+handed to their callbacks on the Tk thread by a poller scheduled with
+after(); callbacks can touch widgets directly.
+
+A circuit breaker fails requests immediately for a while after the backend
+stops answering, so an offline backend costs one timeout rather than one per
+call. Draws to record go through a durable outbox that is uploaded in bulk.
+"""
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "http://127.0.0.1:8000"
+POLL_MS = 20  # How often the Tk thread picks up finished requests
+TIMEOUT = 3
+OUTBOX_FILE = "outbox.json"  # Draws not yet accepted by the backend
+MAX_UPLOAD = 5000  # Draws per /record/batch upload
+BACKOFF_BASE = 1.0  # Seconds; doubles with each consecutive failure
+BACKOFF_MAX = 60.0
+RETRY_STATUSES = (408, 429)  # Client errors that can succeed when resent
+
+
+def write_json(path: str, data):
+    """Write `data` as JSON to a temp file, fsync it, then rename over `path`"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def backoff_delay(failures: int) -> float:
+    """Exponential backoff with jitter after `failures` consecutive failures"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(failures - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class CircuitOpen(Exception):
+    """The backend failed recently; the request was not sent"""
+
+
+class CircuitBreaker:
+    """Opens after a failed request and stays open for an exponentially growing cooldown.
+
+    While open, calls fail fast. Once the cooldown passes, the next request
+    is let through as a probe: success closes the breaker, failure reopens
+    it for longer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.open_until = 0.0
+
+    def allow(self) -> bool:
+        with self._lock:
+            return time.monotonic() >= self.open_until
+
+    def retry_in(self) -> float:
+        """Seconds until requests are let through again"""
+        with self._lock:
+            return max(0.0, self.open_until - time.monotonic())
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self.open_until = time.monotonic() + backoff_delay(self.failures)
+
+
+class BackendClient:
+    """Asynchronous calls to the backend with results delivered on the Tk thread"""
+
+    def __init__(self, root, base_url: str = API_URL, workers: int = 2):
+        self.root = root
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.breaker = CircuitBreaker()
+        self._jobs = queue.Queue()
+        self._done = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"backend-client-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.root.after(POLL_MS, self._poll)
+
+    def request(self, method: str, path: str, on_success=None, on_error=None, timeout: float = TIMEOUT, **kwargs):
+        """Queue a request; `on_success(response)` or `on_error(exception)` runs later on the Tk thread"""
+        self._jobs.put((method, path, on_success, on_error, timeout, kwargs))
+
+    def get(self, path: str, on_success=None, on_error=None, **kwargs):
+        self.request("GET", path, on_success, on_error, **kwargs)
+
+    def post(self, path: str, on_success=None, on_error=None, **kwargs):
+        self.request("POST", path, on_success, on_error, **kwargs)
+
+    def close(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        self.session.close()
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            method, path, on_success, on_error, timeout, kwargs = job
+            if not self.breaker.allow():
+                retry = self.breaker.retry_in()
+                self._done.put((on_error, CircuitOpen(f"Backend unavailable, retrying in {retry:.1f}s")))
+                continue
+            try:
+                response = self.session.request(method, self.base_url + path, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self.breaker.failure()
+                self._done.put((on_error, e))
+                continue
+            if response.status_code >= 500:
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+            self._done.put((on_success, response))
+
+    def _poll(self):
+        while True:
+            try:
+                callback, result = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if callback is None:
+                continue
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"Backend callback failed: {e}")
+        self.root.after(POLL_MS, self._poll)
+
+
+class SpinPrefetcher:
+    """Keeps one /biased_spin/ result fetched ahead, so a spin can start without waiting.
+
+    `take()` returns the prefetched numbers (or None if none arrived yet)
+    and immediately requests the next one. That request replaces the
+    backend's current spin, so `taken` keeps the full response of the spin
+    last handed out for anything that describes what is on screen.
+    """
+
+    def __init__(self, client: BackendClient, validate):
+        self.client = client
+        self.validate = validate
+        self.taken = None
+        self._ready = None
+        self._in_flight = False
+        self._waiters = []
+
+    def fetch(self):
+        if self._in_flight or self._ready is not None:
+            return
+        self._in_flight = True
+        self.client.get("/biased_spin/", self._on_response, self._on_error)
+
+    def take(self):
+        spin, self._ready = self._ready, None
+        if spin is not None:
+            self.taken = spin
+        self.fetch()
+        return None if spin is None else spin["numbers"]
+
+    def when_ready(self, callback):
+        """Call `callback(numbers)` with the next spin that arrives, consuming it"""
+        self._waiters.append(callback)
+        self.fetch()
+
+    def _on_response(self, response):
+        self._in_flight = False
+        spin = response.json() if response.status_code == 200 else {}
+        if not self.validate(spin.get("numbers", [])):
+            print(f"Backend returned status {response.status_code} or an invalid spin")
+            self._flush_waiters(None)
+            return
+        if self._waiters:
+            self._flush_waiters(spin)
+            self.fetch()
+        else:
+            self._ready = spin
+
+    def _on_error(self, error):
+        self._in_flight = False
+        print(f"API error: {error}")
+        self._flush_waiters(None)
+
+    def _flush_waiters(self, spin):
+        if spin is not None:
+            self.taken = spin
+        waiters, self._waiters = self._waiters, []
+        for callback in waiters:
+            callback(None if spin is None else spin["numbers"])
+
+
+class Outbox:
+    """Draws waiting to be recorded, kept on disk until the backend accepts them.
+
+    Every draw is written to the outbox file first and then uploaded with
+    everything else pending in one /record/batch request. Failed uploads are
+    retried with exponential backoff; draws survive restarts until sent.
+    A batch the backend refuses outright (a 4xx) is moved to
+    `<path>.rejected` instead, so it can't hold up later draws.
+    """
+
+    def __init__(self, client: BackendClient, path: str = OUTBOX_FILE):
+        self.client = client
+        self.path = path
+        self.pending = self._load()
+        self.failures = 0
+        self._sending = False
+        self._retry_scheduled = False
+
+    def _load(self) -> list:
+        try:
+            with open(self.path, "r") as f:
+                pending = json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"Could not read {self.path}: {e}")
+            pending = None
+        if isinstance(pending, list):
+            return pending
+        # Set the unreadable file aside rather than overwriting it with the next draw
+        print(f"Moving unreadable outbox to {self.path}.corrupt")
+        try:
+            os.replace(self.path, f"{self.path}.corrupt")
+        except OSError as e:
+            print(f"Could not move {self.path}: {e}")
+        return []
+
+    def _save(self):
+        write_json(self.path, self.pending)
+
+    def _reject(self, count: int, reason: str):
+        """Move the first `count` pending draws to the rejected file"""
+        path = f"{self.path}.rejected"
+        try:
+            with open(path, "r") as f:
+                rejected = json.load(f)
+        except (OSError, ValueError):
+            rejected = []
+        print(f"Backend refused {count} draws ({reason}); moved to {path}")
+        write_json(path, rejected + self.pending[:count])
+        del self.pending[:count]
+        self._save()
+
+    def add(self, numbers):
+        """Queue a draw, stamped now, and try to upload"""
+        self.pending.append({"numbers": list(numbers), "draw_date": datetime.now().isoformat()})
+        self._save()
+        self.flush()
+
+    def flush(self):
+        """Upload pending draws unless an upload or retry is already under way"""
+        if self._sending or self._retry_scheduled or not self.pending:
+            return
+        if not self.client.breaker.allow():
+            self._retry(self.client.breaker.retry_in())
+            return
+        batch = self.pending[:MAX_UPLOAD]
+        self._sending = True
+        self.client.post("/record/batch", lambda response: self._uploaded(len(batch), response), self._failed, json=batch)
+
+    def _uploaded(self, count: int, response):
+        self._sending = False
+        if 400 <= response.status_code < 500 and response.status_code not in RETRY_STATUSES:
+            self._reject(count, f"status {response.status_code}")
+            self.flush()
+            return
+        if response.status_code != 200:
+            self._failed(f"Backend returned status {response.status_code}")
+            return
+        # Rejected rows (bad numbers or dates) would fail forever; they are dropped too
+        for error in response.json().get("errors", []):
+            print(f"Backend rejected draw {self.pending[error['row']]}: {error['error']}")
+        del self.pending[:count]
+        self._save()
+        self.failures = 0
+        self.flush()
+
+    def _failed(self, error):
+        self._sending = False
+        self.failures += 1
+        print(f"Draw upload failed ({len(self.pending)} pending): {error}")
+        self._retry(max(backoff_delay(self.failures), self.client.breaker.retry_in()))
+
+    def _retry(self, delay: float):
+        def retry():
+            self._retry_scheduled = False
+            self.flush()
+
+        self._retry_scheduled = True
+        self.client.root.after(int(delay * 1000), retry)
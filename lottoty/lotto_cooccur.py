@@ -0,0 +1,33 @@
+"""45x45 pair co-occurrence counts over packed combination arrays"""
+from itertools import combinations
+
+import numpy as np
+
+from lotto_rank import NUMBERS, PICK
+
+SIZE = NUMBERS + 1  # Matrices are indexed by number, row/column 0 unused
+CHUNK = 1 << 20  # Rows per bincount pass; bounds the temporary index arrays
+
+_PAIR_COLS = np.array(list(combinations(range(PICK), 2)))
+
+
+def pair_counts(combos: np.ndarray) -> np.ndarray:
+    """Symmetric (46, 46) int64 matrix: cell [a, b] counts rows containing both a and b.
+
+    Rows must hold distinct numbers. For each of the 15 column pairs, the
+    flat cell index a * 46 + b is computed in uint16 and counted with one
+    bincount, so no per-row Python work is done.
+    """
+    upper = np.zeros(SIZE * SIZE, dtype=np.int64)
+    for start in range(0, len(combos), CHUNK):
+        rows = np.asarray(combos[start:start + CHUNK]).astype(np.uint16)
+        rows.sort(axis=1)
+        for i, j in _PAIR_COLS:
+            upper += np.bincount(rows[:, i] * SIZE + rows[:, j], minlength=SIZE * SIZE)
+    upper = upper.reshape(SIZE, SIZE)
+    return upper + upper.T
+
+
+def matrix_payload(matrix: np.ndarray) -> np.ndarray:
+    """The 45x45 part of a count matrix as uint32, numbers 1..45 on both axes"""
+    return np.ascontiguousarray(matrix[1:, 1:], dtype="<u4")
@@ -0,0 +1,183 @@
+"""Append-only, segmented log of every recorded draw
+
+Draws are fixed-size 16-byte records (int64 draw time in microseconds since
+the epoch, 6 uint8 numbers, 2 padding bytes) appended to segment files of
+SEGMENT_DRAWS records each. Draw ids are positions in the log, so the
+offset of any draw is plain arithmetic. The in-memory index only keeps,
+per segment, its first id, record count and date bounds, which lets date
+range queries skip whole segments. Segments are memory-mapped for reads,
+so queries never load the full history.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from lotto_rank import PICK
+
+RECORD = np.dtype([("date", "<i8"), ("numbers", "u1", PICK), ("pad", "u1", 2)])
+SEGMENT_DRAWS = 1 << 20  # 16 MB per segment file
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_timestamp(value: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are stored as-is"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_timestamp(value: int) -> str:
+    return (EPOCH + timedelta(microseconds=int(value))).isoformat()
+
+
+class _Segment:
+    def __init__(self, path: str, start: int):
+        self.path = path
+        self.start = start
+        self.count = 0
+        self.min_date = None
+        self.max_date = None
+
+    def include(self, dates: np.ndarray):
+        if len(dates) == 0:
+            return
+        low, high = int(dates.min()), int(dates.max())
+        self.min_date = low if self.min_date is None else min(self.min_date, low)
+        self.max_date = high if self.max_date is None else max(self.max_date, high)
+
+    def records(self) -> np.ndarray:
+        if self.count == 0:
+            return np.empty(0, dtype=RECORD)
+        return np.memmap(self.path, dtype=RECORD, mode="r", shape=(self.count,))
+
+
+class DrawLog:
+    """Durable history of draws with offset and date-range access"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.segments = []
+        self._handle = None
+        self._recover()
+
+    def __len__(self) -> int:
+        if not self.segments:
+            return 0
+        last = self.segments[-1]
+        return last.start + last.count
+
+    def _recover(self):
+        """Rebuild the index from disk, dropping any torn trailing record"""
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("segment-") and n.endswith(".log"))
+        for name in names:
+            path = os.path.join(self.directory, name)
+            segment = _Segment(path, len(self))
+            size = os.path.getsize(path)
+            if size % RECORD.itemsize:
+                print(f"Truncating torn record at the end of {name}")
+                with open(path, "r+b") as f:
+                    f.truncate(size - size % RECORD.itemsize)
+            segment.count = size // RECORD.itemsize
+            segment.include(segment.records()["date"])
+            self.segments.append(segment)
+
+    def _segment_for_append(self) -> _Segment:
+        if not self.segments or self.segments[-1].count >= SEGMENT_DRAWS:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            start = len(self)
+            path = os.path.join(self.directory, f"segment-{start:012d}.log")
+            self.segments.append(_Segment(path, start))
+        if self._handle is None:
+            self._handle = open(self.segments[-1].path, "ab")
+        return self.segments[-1]
+
+    def append(self, numbers, date: datetime) -> int:
+        """Append one draw and return its id"""
+        return self.append_many(np.asarray([numbers], dtype=np.uint8), np.asarray([to_timestamp(date)]))
+
+    def append_many(self, numbers: np.ndarray, dates: np.ndarray) -> int:
+        """Append (N, 6) draws with their timestamps; returns the first new id"""
+        first_id = len(self)
+        records = np.zeros(len(numbers), dtype=RECORD)
+        records["numbers"] = numbers
+        records["date"] = dates
+        written = 0
+        while written < len(records):
+            segment = self._segment_for_append()
+            chunk = records[written:written + SEGMENT_DRAWS - segment.count]
+            self._handle.write(chunk.tobytes())
+            self._handle.flush()
+            segment.count += len(chunk)
+            segment.include(chunk["date"])
+            written += len(chunk)
+        return first_id
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Records with ids in [start, stop), copied out of the segments"""
+        start, stop = max(start, 0), min(stop, len(self))
+        parts = []
+        for segment in self.segments:
+            low = max(start, segment.start)
+            high = min(stop, segment.start + segment.count)
+            if low < high:
+                parts.append(np.array(segment.records()[low - segment.start:high - segment.start]))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+
+    def query_dates(self, start: int = None, end: int = None, offset: int = 0, limit: int = 100):
+        """Ids and records with start <= date < end, oldest id first, paginated.
+
+        Segments whose date bounds miss the range are skipped entirely, and
+        only one segment's dates are scanned at a time.
+        """
+        ids, parts = [], []
+        skip, wanted = offset, limit
+        for segment in self.segments:
+            if wanted <= 0:
+                break
+            if segment.count == 0:
+                continue
+            if start is not None and segment.max_date < start:
+                continue
+            if end is not None and segment.min_date >= end:
+                continue
+            records = segment.records()
+            mask = np.ones(segment.count, dtype=bool)
+            if start is not None:
+                mask &= records["date"] >= start
+            if end is not None:
+                mask &= records["date"] < end
+            hits = np.flatnonzero(mask)
+            if skip >= len(hits):
+                skip -= len(hits)
+                continue
+            hits = hits[skip:skip + wanted]
+            skip = 0
+            wanted -= len(hits)
+            ids.append(hits + segment.start)
+            parts.append(np.array(records[hits]))
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=RECORD)
+        return np.concatenate(ids), np.concatenate(parts)
+
+    def iter_numbers(self):
+        """Yield the (N, 6) numbers of each segment in turn, oldest first"""
+        for segment in self.segments:
+            if segment.count:
+                yield np.array(segment.records()["numbers"])
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def to_draws(records: np.ndarray) -> list:
+    """Records as the {"numbers", "draw_date"} dicts the API returns"""
+    return [
+        {"numbers": numbers, "draw_date": from_timestamp(date)}
+        for numbers, date in zip(records["numbers"].tolist(), records["date"].tolist())
+    ]
@@ -0,0 +1,190 @@
+"""Vectorized generation of 6-of-45 combinations for the lucky numbers pool"""
+from collections import Counter
+from math import log
+
+import numpy as np
+
+from lotto_cooccur import pair_counts
+from lotto_rank import NUMBERS, PICK, TOTAL_COMBINATIONS, rank_array, unrank_array
+from lotto_rng import make_generator
+
+# Ranks are drawn per vectorized batch in chunks of this many rows
+DRAW_CHUNK = 1 << 20
+
+# Above this fraction of the space, rejection sampling turns into a coupon
+# collector; distinct ranks are then selected exactly instead
+EXACT_FRACTION = 0.25
+# Weighted draws repeat heavy combinations more often, so Gumbel-top-k over
+# the whole space (a fixed ~2 s) wins from a smaller fraction
+WEIGHTED_EXACT_FRACTION = 0.1
+
+
+def random_ranks(count: int, rng: np.random.Generator, low: int = 0, high: int = TOTAL_COMBINATIONS) -> np.ndarray:
+    """Draw `count` uniform ranks in [low, high) (with replacement) as uint32"""
+    return rng.integers(low, high, size=count, dtype=np.uint32)
+
+
+def random_combinations(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Draw `count` uniform combinations as a sorted (count, 6) uint8 array"""
+    out = np.empty((count, PICK), dtype=np.uint8)
+    for start in range(0, count, DRAW_CHUNK):
+        rows = min(DRAW_CHUNK, count - start)
+        out[start:start + rows] = unrank_array(random_ranks(rows, rng))
+    return out
+
+
+def _expected_draws(have: int, want: int, space: int = TOTAL_COMBINATIONS) -> int:
+    """Coupon-collector estimate of draws needed to go from `have` to `want` distinct"""
+    # Clamp so the estimate stays finite when asking for the whole space
+    want_frac = min(want / space, 1 - 1 / space)
+    have_frac = min(have / space, want_frac)
+    estimate = space * (log(1 - have_frac) - log(1 - want_frac))
+    return int(estimate * 1.01) + 64
+
+
+def select_distinct_ranks(count: int, space: int, rng: np.random.Generator) -> np.ndarray:
+    """Exactly `count` distinct ranks from [0, space), uniformly, in random order.
+
+    Up to half the space this is a partial permutation. Beyond that the
+    complement (the ranks to leave out) is selected instead and inverted
+    with a boolean mask, so the cost stays bounded up to the full space.
+    """
+    if count > space // 2:
+        keep = np.ones(space, dtype=bool)
+        keep[select_distinct_ranks(space - count, space, rng)] = False
+        ranks = np.flatnonzero(keep).astype(np.uint32)
+        rng.shuffle(ranks)
+        return ranks
+    return rng.choice(space, size=count, replace=False).astype(np.uint32)
+
+
+def generate_pool_ranks(sample_size: int, rng: np.random.Generator = None,
+                        low: int = 0, high: int = TOTAL_COMBINATIONS) -> np.ndarray:
+    """Draw `sample_size` distinct combination ranks from [low, high), in first-drawn order.
+
+    Same semantics as adding `sorted(random.sample(range(1, 46), 6))` to a
+    set until it holds `sample_size` entries, but batched: ranks are drawn
+    uniformly in bulk and deduplicated with np.unique. Past EXACT_FRACTION
+    of the space, `select_distinct_ranks` is used instead.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    space = high - low
+    sample_size = max(0, min(sample_size, space))
+    if sample_size > EXACT_FRACTION * space:
+        return (select_distinct_ranks(sample_size, space, rng) + low).astype(np.uint32)
+
+    ranks = np.empty(0, dtype=np.uint32)
+    while len(ranks) < sample_size:
+        batch = random_ranks(_expected_draws(len(ranks), sample_size, space), rng, low, high)
+        ranks = np.concatenate([ranks, batch])
+        ranks = _first_occurrences(ranks)
+
+    return ranks[:sample_size]
+
+
+def generate_pool(sample_size: int, rng: np.random.Generator = None) -> np.ndarray:
+    """Generate `sample_size` distinct combinations as a packed (N, 6) uint8 array"""
+    return unrank_array(generate_pool_ranks(sample_size, rng))
+
+
+def _first_occurrences(ranks: np.ndarray) -> np.ndarray:
+    """Drop repeated ranks, keeping draw order"""
+    _, first = np.unique(ranks, return_index=True)
+    first.sort()
+    return ranks[first]
+
+
+def weighted_combinations(count: int, probabilities: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Row-sorted combinations drawn with P(combination) proportional to the product of its number weights.
+
+    Six numbers are drawn independently from `probabilities` (over 1..45)
+    and rows with a repeat are rejected, which leaves exactly the product
+    distribution over distinct combinations. May return fewer than `count`.
+    """
+    rows = rng.choice(NUMBERS, size=(count, PICK), p=probabilities).astype(np.uint8) + 1
+    rows.sort(axis=1)
+    return rows[(rows[:, 1:] != rows[:, :-1]).all(axis=1)]
+
+
+def gumbel_top_ranks(sample_size: int, log_weights: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Weighted sample of distinct ranks without replacement via Gumbel-top-k over the whole space.
+
+    Every combination gets key log(weight) + Gumbel noise; the `sample_size`
+    largest keys, in descending order, are distributed exactly like drawing
+    combinations one at a time proportionally to weight and skipping repeats.
+    """
+    keys = np.empty(TOTAL_COMBINATIONS, dtype=np.float32)
+    for start in range(0, TOTAL_COMBINATIONS, DRAW_CHUNK):
+        stop = min(start + DRAW_CHUNK, TOTAL_COMBINATIONS)
+        combos = unrank_array(np.arange(start, stop))
+        keys[start:stop] = log_weights[combos].sum(axis=1) + rng.gumbel(size=stop - start)
+    top = np.argpartition(keys, TOTAL_COMBINATIONS - sample_size)[TOTAL_COMBINATIONS - sample_size:]
+    return top[np.argsort(keys[top])[::-1]].astype(np.uint32)
+
+
+def generate_weighted_pool_ranks(sample_size: int, weights: np.ndarray, rng: np.random.Generator = None) -> np.ndarray:
+    """`sample_size` distinct ranks, each combination weighted by the product of its number weights.
+
+    `weights` is indexed by number (0 unused) and must be positive. This is
+    sampling without replacement: combinations are drawn proportionally to
+    weight and repeats skipped, so the result stays a set like the uniform
+    pool. Past WEIGHTED_EXACT_FRACTION of the space the repeats dominate, and
+    `gumbel_top_ranks` selects the same distribution in one pass instead.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    weights = np.asarray(weights, dtype=np.float64)
+    sample_size = max(0, min(sample_size, TOTAL_COMBINATIONS))
+    if sample_size > WEIGHTED_EXACT_FRACTION * TOTAL_COMBINATIONS:
+        log_weights = np.log(np.maximum(weights, np.finfo(np.float64).tiny))
+        return gumbel_top_ranks(sample_size, log_weights, rng)
+
+    probabilities = weights[1:] / weights[1:].sum()
+    ranks = np.empty(0, dtype=np.uint32)
+    accepted = 1.0  # Fraction of drawn rows that turned out new; sizes the next batch
+    while len(ranks) < sample_size:
+        missing = sample_size - len(ranks)
+        batch = min(DRAW_CHUNK, int(missing / accepted * 1.1) + 64)
+        have = len(ranks)
+        ranks = _first_occurrences(np.concatenate([ranks, rank_array(weighted_combinations(batch, probabilities, rng))]))
+        accepted = max((len(ranks) - have) / batch, 1e-3)
+
+    return ranks[:sample_size]
+
+
+def generate_weighted_pool(sample_size: int, weights: np.ndarray, rng: np.random.Generator = None) -> np.ndarray:
+    """`generate_pool` with combinations weighted by the product of per-number `weights`"""
+    return unrank_array(generate_weighted_pool_ranks(sample_size, weights, rng))
+
+
+def number_counts(pool: np.ndarray) -> np.ndarray:
+    """Occurrences of each number across the pool, indexed by number (0 unused)"""
+    return np.bincount(np.asarray(pool).ravel(), minlength=NUMBERS + 1)
+
+
+def counts_to_frequencies(counts: np.ndarray) -> Counter:
+    return Counter({num: int(counts[num]) for num in range(1, NUMBERS + 1) if counts[num]})
+
+
+def frequencies_to_counts(frequencies) -> np.ndarray:
+    """Inverse of `counts_to_frequencies`"""
+    return np.array([frequencies.get(num, 0) for num in range(NUMBERS + 1)], dtype=np.int64)
+
+
+def pool_frequencies(pool: np.ndarray) -> Counter:
+    """Count how often each number appears across the pool"""
+    return counts_to_frequencies(number_counts(pool))
+
+
+def build_pool(sample_size: int, seed=None, bit_generator: str = "pcg64", weights=None):
+    """Generate a pool with its frequencies and pair counts; safe to run in a worker process.
+
+    With per-number `weights`, the pool is drawn by `generate_weighted_pool_ranks`.
+    """
+    rng = make_generator(seed, bit_generator)
+    if weights is None:
+        pool = generate_pool(sample_size, rng)
+    else:
+        pool = generate_weighted_pool(sample_size, weights, rng)
+    return pool, pool_frequencies(pool), pair_counts(pool)
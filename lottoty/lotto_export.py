@@ -0,0 +1,51 @@
+"""Chunked pool export as NDJSON, CSV or packed binary
+
+The pool is walked in fixed-size chunks and each chunk is encoded and
+yielded on its own, so memory stays bounded by the chunk size whatever the
+pool size (a memmapped pool is only paged in as it is read).
+"""
+import numpy as np
+
+from lotto_json import dumps
+from lotto_rank import PICK
+
+EXPORT_CHUNK = 1 << 16  # Rows per yielded chunk
+CSV_HEADER = b",".join(b"n%d" % i for i in range(1, PICK + 1)) + b"\n"
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "binary": "application/octet-stream"
+}
+
+
+def contains_mask(rows: np.ndarray, numbers) -> np.ndarray:
+    """Rows containing every one of `numbers`"""
+    mask = np.ones(len(rows), dtype=bool)
+    for number in numbers:
+        mask &= (rows == number).any(axis=1)
+    return mask
+
+
+def encode_rows(rows: np.ndarray, fmt: str) -> bytes:
+    """One chunk of packed (N, 6) rows in the export format"""
+    if fmt == "binary":
+        return np.ascontiguousarray(rows, dtype=np.uint8).tobytes()
+    # Encode the chunk as one JSON array, then split it into lines
+    body = dumps(rows)
+    if fmt == "ndjson":
+        return body[1:-1].replace(b"],[", b"]\n[") + b"\n"
+    return body[2:-2].replace(b"],[", b"\n") + b"\n"
+
+
+def export_chunks(pool: np.ndarray, fmt: str, offset: int = 0, limit: int = None, contains=()):
+    """Yield encoded chunks of pool[offset:offset + limit], keeping rows that contain all of `contains`"""
+    stop = len(pool) if limit is None else min(len(pool), offset + limit)
+    if fmt == "csv":
+        yield CSV_HEADER
+    for start in range(offset, stop, EXPORT_CHUNK):
+        rows = pool[start:min(start + EXPORT_CHUNK, stop)]
+        if contains:
+            rows = rows[contains_mask(rows, contains)]
+        if len(rows):
+            yield encode_rows(rows, fmt)
@@ -0,0 +1,90 @@
+"""Per-number bitmap index over pool positions
+
+Bit i of number n's bitset is set when pool row i contains n. Containment
+and exclusion queries then become ANDs / ORs over 45 uint64 word arrays
+(N/64 words each), and counts are popcounts, instead of scans of the
+(N, 6) pool.
+"""
+import numpy as np
+
+from lotto_rank import NUMBERS, PICK
+
+INDEX_CHUNK = 1 << 18  # Pool rows per build step; a multiple of 64
+
+if hasattr(np, "bitwise_count"):
+    def word_counts(words: np.ndarray) -> np.ndarray:
+        """Set bits per uint64 word"""
+        return np.bitwise_count(words)
+else:  # NumPy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def word_counts(words: np.ndarray) -> np.ndarray:
+        """Set bits per uint64 word"""
+        return _BYTE_COUNTS[words.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> int:
+    return int(word_counts(words).sum(dtype=np.int64))
+
+
+class PoolIndex:
+    """45 bitsets over the positions of one pool"""
+
+    def __init__(self, bits: np.ndarray, size: int):
+        self.bits = bits  # (NUMBERS + 1, words) uint64; row 0 unused
+        self.size = size
+        self.valid = self._prefix(size, bits.shape[1])
+
+    @staticmethod
+    def _prefix(size: int, words: int) -> np.ndarray:
+        """Bitset with the first `size` positions set"""
+        valid = np.zeros(words * 64, dtype=bool)
+        valid[:size] = True
+        return np.packbits(valid, bitorder="little").view(np.uint64)
+
+    @classmethod
+    def build(cls, pool: np.ndarray) -> "PoolIndex":
+        size = len(pool)
+        words = -(-size // 64)
+        bits = np.zeros((NUMBERS + 1, words * 8), dtype=np.uint8)
+        rows = np.arange(INDEX_CHUNK)
+        for start in range(0, size, INDEX_CHUNK):
+            chunk = np.asarray(pool[start:start + INDEX_CHUNK])
+            member = np.zeros((len(chunk), NUMBERS + 1), dtype=bool)
+            for col in range(PICK):
+                member[rows[:len(chunk)], chunk[:, col]] = True
+            packed = np.packbits(member, axis=0, bitorder="little")
+            bits[:, start // 8:start // 8 + len(packed)] = packed.T
+        return cls(bits.view(np.uint64), size)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def mask(self, include=(), exclude=()) -> np.ndarray:
+        """Bitset of positions whose rows hold every `include` and no `exclude` number"""
+        result = self.valid.copy()
+        for number in include:
+            result &= self.bits[number]
+        for number in exclude:
+            result &= ~self.bits[number]
+        return result
+
+    def count(self, include=(), exclude=()) -> int:
+        return popcount(self.mask(include, exclude))
+
+    @staticmethod
+    def positions(mask: np.ndarray, offset: int = 0, limit: int = None) -> np.ndarray:
+        """Ascending pool positions set in `mask`, paged by offset/limit"""
+        words = np.flatnonzero(mask)
+        # Unpack only the non-empty words the page falls in
+        seen = np.cumsum(word_counts(mask[words]), dtype=np.int64)
+        first = int(np.searchsorted(seen, offset, side="right"))
+        last = len(words) if limit is None else int(np.searchsorted(seen, offset + limit, side="left")) + 1
+        skipped = int(seen[first - 1]) if first else 0
+        words = words[first:last]
+        bits = np.unpackbits(mask[words].view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        word_rows, bit_cols = np.nonzero(bits)
+        found = words[word_rows].astype(np.int64) * 64 + bit_cols
+        found = found[offset - skipped:]
+        return found if limit is None else found[:limit]
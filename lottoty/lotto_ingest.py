@@ -0,0 +1,150 @@
+"""Bulk draw ingestion from JSON, NDJSON or CSV bodies
+
+A record is either an object {"numbers": [...], "draw_date": "..."} or a
+bare list of numbers (the format of lottery_history.json); CSV rows are
+n1,...,n6 with an optional ISO draw date as a seventh field and an optional
+header line. Streamed bodies are split into chunks of RECORD_CHUNK records.
+Each record is parsed on its own, but ranges and repeated numbers are
+checked for the whole chunk at once, so a chunk can be appended to the draw
+log in one go.
+"""
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from lotto_drawlog import to_timestamp
+from lotto_json import loads
+from lotto_rank import NUMBERS, PICK
+
+RECORD_CHUNK = 1 << 14  # Records validated and appended together
+
+# Request media types of the streamed formats; anything else is read as one JSON list
+FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv"
+}
+
+WRONG_COUNT = f"Exactly {PICK} numbers required"
+OUT_OF_RANGE = f"Numbers must be between 1 and {NUMBERS}"
+REPEATED = "Numbers must be distinct"
+NOT_INTEGERS = "Numbers must be integers"
+BAD_DATE = "draw_date must be an ISO 8601 date"
+
+
+def body_format(content_type: Optional[str]) -> str:
+    media = (content_type or "").split(";")[0].strip().lower()
+    return FORMATS.get(media, "json")
+
+
+def draw_error(numbers) -> Optional[str]:
+    """Why a draw can't be recorded, or None if it is valid"""
+    if len(numbers) != PICK:
+        return WRONG_COUNT
+    if any(n < 1 or n > NUMBERS for n in numbers):
+        return OUT_OF_RANGE
+    if len(set(numbers)) != PICK:
+        return REPEATED
+    return None
+
+
+def record_fields(record):
+    """(numbers, draw_date) of one JSON record"""
+    if isinstance(record, dict):
+        return record.get("numbers"), record.get("draw_date")
+    return record, None
+
+
+def parse_line(line: bytes, fmt: str):
+    """(numbers, draw_date) of one NDJSON or CSV line, or an error message"""
+    if fmt == "ndjson":
+        try:
+            return record_fields(loads(line))
+        except ValueError:
+            return "Invalid JSON"
+    fields = line.decode("utf-8", "replace").split(",")
+    if len(fields) not in (PICK, PICK + 1):
+        return WRONG_COUNT
+    try:
+        numbers = [int(field) for field in fields[:PICK]]
+    except ValueError:
+        return NOT_INTEGERS
+    return numbers, fields[PICK].strip() if len(fields) > PICK else None
+
+
+async def read_records(stream, fmt: str, chunk: int = RECORD_CHUNK):
+    """Yield lists of parsed lines from an async byte stream; blank lines are skipped"""
+    pending = b""
+    lines = []
+    first = True
+    async for data in stream:
+        pending += data
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            line = line.strip()
+            if not line:
+                continue
+            # A CSV header is recognised by its first field not being a number
+            if first and fmt == "csv" and not line.split(b",")[0].strip().lstrip(b"-").isdigit():
+                first = False
+                continue
+            first = False
+            lines.append(line)
+        while len(lines) >= chunk:
+            yield [parse_line(line, fmt) for line in lines[:chunk]]
+            lines = lines[chunk:]
+    if pending.strip():
+        lines.append(pending.strip())
+    if lines:
+        yield [parse_line(line, fmt) for line in lines]
+
+
+def validate_records(records: list, default_date: datetime):
+    """Split parsed records into valid draws and errors.
+
+    Returns (numbers, dates, errors): an (N, 6) uint8 array of the valid
+    draws, their int64 timestamps (`default_date` where none was given), and
+    (record index, message) pairs in index order.
+    """
+    errors = {}
+    date_errors = {}
+    kept, rows, dates = [], [], []
+    default = to_timestamp(default_date)
+    for i, record in enumerate(records):
+        if isinstance(record, str):
+            errors[i] = record
+            continue
+        numbers, draw_date = record
+        if not isinstance(numbers, list) or len(numbers) != PICK:
+            errors[i] = WRONG_COUNT
+            continue
+        if not all(type(n) is int for n in numbers):
+            errors[i] = NOT_INTEGERS
+            continue
+        try:
+            dates.append(to_timestamp(datetime.fromisoformat(draw_date)) if draw_date else default)
+        except (TypeError, ValueError):
+            date_errors[i] = BAD_DATE
+            dates.append(default)
+        kept.append(i)
+        rows.append(numbers)
+
+    try:
+        grid = np.array(rows, dtype=np.int64).reshape(-1, PICK)
+    except OverflowError:
+        # Clamping keeps huge values out of range without changing any verdict
+        grid = np.array([[min(max(n, 0), NUMBERS + 1) for n in row] for row in rows], dtype=np.int64).reshape(-1, PICK)
+    out_of_range = ((grid < 1) | (grid > NUMBERS)).any(axis=1)
+    ordered = np.sort(grid, axis=1)
+    repeated = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+    for position in np.flatnonzero(out_of_range | repeated).tolist():
+        errors[kept[position]] = OUT_OF_RANGE if out_of_range[position] else REPEATED
+    for i, message in date_errors.items():
+        errors.setdefault(i, message)
+
+    kept = np.array(kept, dtype=np.int64)
+    valid = ~np.isin(kept, np.fromiter(errors, dtype=np.int64, count=len(errors)))
+    return (grid[valid].astype(np.uint8), np.array(dates, dtype=np.int64)[valid],
+            sorted(errors.items()))
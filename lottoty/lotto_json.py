@@ -0,0 +1,51 @@
+"""JSON encoding for responses and state files: orjson when installed, stdlib otherwise
+
+Both paths produce the same compact UTF-8 output, serialize NumPy arrays
+and scalars directly, and turn integer dict keys (number frequencies) into
+strings the way stdlib json always has.
+"""
+import json
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional speedup, see requirements.txt
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(obj):
+    """NumPy values neither encoder handles natively (memmaps, strided views, scalars)"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def stdlib_dumps(obj) -> bytes:
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    dumps = stdlib_dumps
+    loads = json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps`; returning it directly also skips jsonable_encoder"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,110 @@
+"""Vectorized ticket matching against a winning draw
+
+Tickets become uint64 bitmasks (bit n set when the ticket holds number n),
+so the hits of every ticket are one AND and one popcount per ticket. Rows
+don't need to be sorted; a repeated number only counts once.
+
+Usage: python lotto_match.py N1 N2 N3 N4 N5 N6 [--history lottery_history.json] [--pool data/lucky_numbers.bin]
+"""
+import argparse
+
+import numpy as np
+
+from lotto_index import word_counts
+from lotto_rank import PICK
+
+MATCH_CHUNK = 1 << 16  # Tickets per step; small enough for temporaries to stay in cache
+MAX_NUMBER = 63  # Largest number a uint64 mask can hold
+
+# Prize tiers by hits, highest first
+PRIZE_TIERS = {6: "jackpot", 5: "second", 4: "third", 3: "fourth"}
+
+_BITS = np.left_shift(np.uint64(1), np.arange(MAX_NUMBER + 1, dtype=np.uint64))
+
+
+def ticket_masks(tickets: np.ndarray) -> np.ndarray:
+    """One uint64 bitmask per (N, 6) ticket row"""
+    tickets = np.asarray(tickets)
+    masks = np.zeros(len(tickets), dtype=np.uint64)
+    for col in range(tickets.shape[1] if tickets.ndim == 2 else 0):
+        masks |= _BITS[tickets[:, col]]
+    return masks
+
+
+def draw_mask(numbers) -> np.uint64:
+    return np.bitwise_or.reduce(_BITS[np.asarray(numbers, dtype=np.int64)], initial=np.uint64(0))
+
+
+def hit_counts(tickets: np.ndarray, numbers) -> np.ndarray:
+    """Numbers each ticket shares with the draw, as uint8"""
+    winning = draw_mask(numbers)
+    hits = np.empty(len(tickets), dtype=np.uint8)
+    for start in range(0, len(tickets), MATCH_CHUNK):
+        masks = ticket_masks(tickets[start:start + MATCH_CHUNK])
+        hits[start:start + len(masks)] = word_counts(masks & winning)
+    return hits
+
+
+def mask_hits(masks: np.ndarray, winning) -> np.ndarray:
+    """`hit_counts` for precomputed ticket masks; `winning` is one mask or one per ticket"""
+    return word_counts(masks & winning).astype(np.uint8, copy=False)
+
+
+def evaluate(tickets: np.ndarray, numbers, min_hits: int = min(PRIZE_TIERS), limit: int = None) -> dict:
+    """Hit histogram, prize tier counts and indices of tickets with at least `min_hits`"""
+    hits = hit_counts(tickets, numbers)
+    histogram = np.bincount(hits, minlength=PICK + 1)
+    winners = np.flatnonzero(hits >= min_hits)
+    return {
+        "tickets": len(hits),
+        "histogram": histogram,
+        "tiers": {name: int(histogram[h]) for h, name in PRIZE_TIERS.items()},
+        "winners": winners if limit is None else winners[:limit],
+        "winner_hits": hits[winners if limit is None else winners[:limit]],
+        "total_winners": len(winners)
+    }
+
+
+def main():
+    import json
+
+    from lotto_ingest import draw_error
+    from lotto_store import load_pool
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("numbers", type=int, nargs=PICK)
+    parser.add_argument("--history", help="frontend history file (a JSON list of 6-number lists)")
+    parser.add_argument("--pool", help="saved pool file, e.g. data/lucky_numbers.bin")
+    args = parser.parse_args()
+    error = draw_error(args.numbers)
+    if error:
+        parser.error(error)
+
+    sources = {}  # name -> (tickets, original row index of each ticket)
+    if args.history:
+        with open(args.history) as f:
+            history = json.load(f)
+        # The history file has hand-edited junk rows; only well-formed tickets are matched
+        kept = [
+            i for i, row in enumerate(history)
+            if isinstance(row, list) and all(type(n) is int for n in row) and draw_error(row) is None
+        ]
+        tickets = np.array([history[i] for i in kept], dtype=np.uint8).reshape(-1, PICK)
+        sources[args.history] = tickets, np.array(kept, dtype=np.int64)
+    if args.pool:
+        saved = load_pool(args.pool)
+        if saved is None:
+            parser.error(f"cannot read pool file {args.pool}")
+        sources[args.pool] = saved[0], np.arange(len(saved[0]))
+    if not sources:
+        parser.error("give --history and/or --pool")
+
+    for name, (tickets, rows) in sources.items():
+        result = evaluate(tickets, args.numbers, limit=10)
+        print(f"{name}: {result['tickets']} tickets, hits 0-6: {result['histogram'].tolist()}")
+        print(f"  tiers: {result['tiers']}")
+        for index, hits in zip(result["winners"], result["winner_hits"]):
+            print(f"  #{rows[index]}: {np.asarray(tickets[index]).tolist()} ({hits} hits)")
+
+if __name__ == "__main__":
+    main()
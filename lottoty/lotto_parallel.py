@@ -0,0 +1,86 @@
+"""Multi-process pool generation sharded over the combination rank space
+
+The rank space [0, comb(45, 6)) is cut into one contiguous range per shard.
+How many of the `sample_size` combinations fall in each range is drawn from
+a multivariate hypergeometric distribution, which is exactly how a uniform
+sample without replacement splits across the ranges. Each worker then draws
+its share of distinct ranks inside its own range with an independent RNG
+stream and unranks them straight into a shared-memory output buffer, so the
+pool is never pickled back. Ranges are disjoint, so shards can't produce
+duplicates of each other and merging is just the concatenation already
+sitting in the buffer. Workers only return their (small) number and pair
+counts, which are summed.
+"""
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from lotto_cooccur import pair_counts
+from lotto_engine import counts_to_frequencies, generate_pool_ranks, number_counts
+from lotto_rank import PICK, TOTAL_COMBINATIONS, unrank_array
+from lotto_rng import make_generator
+
+
+def shard_plan(sample_size: int, shards: int, rng: np.random.Generator):
+    """(low, high, count, offset) per shard; counts sum to sample_size"""
+    sample_size = max(0, min(sample_size, TOTAL_COMBINATIONS))
+    bounds = np.linspace(0, TOTAL_COMBINATIONS, shards + 1).astype(np.int64)
+    sizes = np.diff(bounds)
+    counts = rng.multivariate_hypergeometric(sizes, sample_size)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return [
+        (int(bounds[i]), int(bounds[i + 1]), int(counts[i]), int(offsets[i]))
+        for i in range(shards)
+    ]
+
+
+def _fill_shard(shm_name, rows, low, high, count, offset, seed, bit_generator):
+    """Worker: write `count` distinct combinations from [low, high) into the shared buffer"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray((rows, PICK), dtype=np.uint8, buffer=shm.buf)
+        ranks = generate_pool_ranks(count, make_generator(seed, bit_generator), low, high)
+        shard = out[offset:offset + count]
+        shard[:] = unrank_array(ranks)
+        counts, pairs = number_counts(shard), pair_counts(shard)
+        del out, shard  # Release buffer views before closing
+    finally:
+        shm.close()
+    return counts, pairs
+
+
+def build_pool_parallel(sample_size: int, workers: int = None, seed=None, bit_generator: str = "pcg64"):
+    """Parallel `lotto_engine.build_pool`: returns (pool, frequencies, pair counts).
+
+    `seed` may be an int or SeedSequence; one child stream is spawned per shard.
+    """
+    workers = workers or os.cpu_count() or 1
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    plan_seed, *shard_seeds = seed_seq.spawn(workers + 1)
+    plan = shard_plan(sample_size, workers, make_generator(plan_seed, bit_generator))
+    rows = sum(count for _, _, count, _ in plan)
+    if rows == 0:
+        empty = np.empty((0, PICK), dtype=np.uint8)
+        return empty, Counter(), pair_counts(empty)
+
+    shm = shared_memory.SharedMemory(create=True, size=rows * PICK)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_fill_shard, shm.name, rows, low, high, count, offset, shard_seed, bit_generator)
+                for (low, high, count, offset), shard_seed in zip(plan, shard_seeds)
+            ]
+            results = [future.result() for future in futures]
+        view = np.ndarray((rows, PICK), dtype=np.uint8, buffer=shm.buf)
+        pool = view.copy()
+        del view
+    finally:
+        shm.close()
+        shm.unlink()
+
+    counts = sum(result[0] for result in results)
+    pairs = sum(result[1] for result in results)
+    return pool, counts_to_frequencies(counts), pairs
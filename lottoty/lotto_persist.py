@@ -0,0 +1,108 @@
+"""Coalescing write-behind persistence for the backend's state files"""
+import asyncio
+import time
+
+from lotto_store import atomic_write
+
+
+class WriteBehind:
+    """Collect file updates and flush them atomically on an interval.
+
+    `schedule(path, snapshot)` records that `path` is dirty. At flush time
+    `snapshot()` is called on the event loop, so it sees consistent state,
+    and must return either bytes or a `write(file)` callback. Only the
+    latest snapshot per path is kept, so a burst of updates to one file
+    costs a single write. Disk I/O runs in the default thread pool.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._pending = {}
+        self._task = None
+        self._lock = None
+        self._stopping = None  # Event set by stop(); the flusher exits at its next wait
+        self.counters = {
+            "scheduled": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "files_written": 0,
+            "errors": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0
+        }
+
+    def schedule(self, path: str, snapshot):
+        """Mark `path` dirty; writes immediately when no event loop is running"""
+        self.counters["scheduled"] += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(path, snapshot())
+            return
+        if path in self._pending:
+            self.counters["coalesced"] += 1
+        self._pending[path] = snapshot
+        self._ensure_running()
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), "interval": self.interval, **self.counters}
+
+    async def flush(self):
+        """Write every pending file now"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            snapshots = []
+            for path, snapshot in pending.items():
+                try:
+                    snapshots.append((path, snapshot()))
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    print(f"Error preparing {path}: {e}")
+
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            for path, data in snapshots:
+                await loop.run_in_executor(None, self._write, path, data)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            self.counters["flushes"] += 1
+            self.counters["last_flush_ms"] = round(elapsed_ms, 3)
+            self.counters["max_flush_ms"] = round(max(self.counters["max_flush_ms"], elapsed_ms), 3)
+
+    async def stop(self):
+        """Stop the background flusher, letting a flush in progress finish, and flush whatever is left"""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        # Only the wait is interruptible; a flush that started always completes
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def _write(self, path: str, data):
+        try:
+            if isinstance(data, (bytes, bytearray)):
+                atomic_write(path, lambda f: f.write(data))
+            else:
+                atomic_write(path, data)
+            self.counters["files_written"] += 1
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Error writing {path}: {e}")
@@ -0,0 +1,111 @@
+"""LRU cache of pool snapshots keyed by the configuration that produced them
+
+A snapshot is the tuple set_lucky_pool takes: (pool, frequencies, pairs,
+index, present), where everything after the frequencies may be None. Snapshots
+are kept in memory up to a byte budget. Past it, the least recently used ones
+are evicted and, when a spill directory is set, written to disk in the
+lotto_store format so a later hit can read them back (derived structures
+are then recomputed lazily).
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from lotto_store import atomic_write, load_pool, pool_writer
+
+MAX_SPILLED = 16  # Spilled snapshots kept on disk
+
+
+def snapshot_bytes(snapshot) -> int:
+    return sum(getattr(part, "nbytes", 0) for part in snapshot)
+
+
+class PoolCache:
+    """Pool snapshots by configuration key, with LRU eviction and optional disk spill.
+
+    Keys are tuples whose first element is the sample size.
+    """
+
+    def __init__(self, budget: int, spill_dir: str = None, spill=None):
+        """`spill(path, make_write)` persists a snapshot; by default it is written synchronously"""
+        self.budget = budget
+        self.spill_dir = spill_dir
+        self.spill = spill or (lambda path, make_write: atomic_write(path, make_write()))
+        self._entries = OrderedDict()
+        self._spilled = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.version = 0  # Bumped on every change, for response caching
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            # Spilled files are only reachable through this process' key map
+            for name in os.listdir(spill_dir):
+                os.remove(os.path.join(spill_dir, name))
+
+    def _path(self, key) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+        return os.path.join(self.spill_dir, f"pool-{digest}.bin")
+
+    def get(self, key):
+        """The snapshot for `key`, or None"""
+        self.version += 1
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if key in self._spilled:
+            saved = load_pool(self._spilled[key])
+            if saved is not None and saved[3] == key:
+                self.spill_hits += 1
+                # Read into memory so the file stays free to be removed or replaced
+                snapshot = (np.array(saved[0]), saved[1], None, None, None)
+                self.put(key, snapshot)
+                return snapshot
+        self.misses += 1
+        return None
+
+    def put(self, key, snapshot):
+        self.version += 1
+        if key in self._entries:
+            self.bytes -= snapshot_bytes(self._entries.pop(key))
+        self._entries[key] = snapshot
+        self.bytes += snapshot_bytes(snapshot)
+        while self.bytes > self.budget and self._entries:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self.bytes -= snapshot_bytes(evicted)
+            self.evictions += 1
+            self._spill(evicted_key, evicted)
+
+    def _spill(self, key, snapshot):
+        if self.spill_dir is None:
+            return
+        if key in self._spilled:
+            self._spilled.move_to_end(key)  # Still on disk from an earlier eviction
+            return
+        pool, frequencies = snapshot[0], snapshot[1]
+        path = self._path(key)
+        self.spill(path, lambda: pool_writer(pool, frequencies, key[0], key))
+        self._spilled[key] = path
+        if len(self._spilled) > MAX_SPILLED:
+            _, old_path = self._spilled.popitem(last=False)
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "budget": self.budget,
+            "spilled": len(self._spilled),
+            "hits": self.hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
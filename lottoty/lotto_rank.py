@@ -0,0 +1,63 @@
+"""Exact ranking/unranking of 6-of-45 combinations (combinatorial number system)
+
+Every sorted combination c1 < ... < c6 of 1..45 maps to a unique rank
+    sum(comb(c_i - 1, i)) for i = 1..6
+in [0, comb(45, 6)), which fits in a uint32. Ranks are colex ordered, so
+[1, 2, 3, 4, 5, 6] is rank 0 and [40, 41, 42, 43, 44, 45] is the last one.
+"""
+from math import comb
+
+import numpy as np
+
+NUMBERS = 45  # Balls are numbered 1..45
+PICK = 6  # Numbers per combination
+TOTAL_COMBINATIONS = comb(NUMBERS, PICK)
+
+# _BINOM[n, k] == comb(n, k) for n < 45, k <= 6
+_BINOM = np.array(
+    [[comb(n, k) for k in range(PICK + 1)] for n in range(NUMBERS)],
+    dtype=np.int64
+)
+
+
+def rank(combo) -> int:
+    """Rank of a single combination (any order, 6 distinct numbers in 1..45)"""
+    values = sorted(combo)
+    if len(values) != PICK or len(set(values)) != PICK:
+        raise ValueError("Exactly 6 distinct numbers required")
+    if values[0] < 1 or values[-1] > NUMBERS:
+        raise ValueError("Numbers must be between 1 and 45")
+    return sum(comb(v - 1, i + 1) for i, v in enumerate(values))
+
+
+def unrank(r: int) -> tuple:
+    """Combination with rank `r`, as a sorted tuple"""
+    if not 0 <= r < TOTAL_COMBINATIONS:
+        raise ValueError(f"Rank must be in [0, {TOTAL_COMBINATIONS})")
+    combo = []
+    for k in range(PICK, 0, -1):
+        # Largest v with comb(v, k) <= r
+        v = int(np.searchsorted(_BINOM[:, k], r, side="right")) - 1
+        combo.append(v + 1)
+        r -= comb(v, k)
+    return tuple(reversed(combo))
+
+
+def rank_array(combos: np.ndarray) -> np.ndarray:
+    """Ranks of a row-sorted (N, 6) combination array, as uint32"""
+    values = np.asarray(combos).astype(np.int64) - 1
+    ranks = np.zeros(len(values), dtype=np.int64)
+    for i in range(PICK):
+        ranks += _BINOM[values[:, i], i + 1]
+    return ranks.astype(np.uint32)
+
+
+def unrank_array(ranks: np.ndarray) -> np.ndarray:
+    """Row-sorted (N, 6) uint8 combinations for an array of ranks"""
+    remaining = np.asarray(ranks).astype(np.int64)
+    combos = np.empty((len(remaining), PICK), dtype=np.uint8)
+    for k in range(PICK, 0, -1):
+        values = np.searchsorted(_BINOM[:, k], remaining, side="right") - 1
+        combos[:, k - 1] = values + 1
+        remaining -= _BINOM[values, k]
+    return combos
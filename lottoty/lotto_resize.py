@@ -0,0 +1,95 @@
+"""Incremental pool resizing: the work is proportional to the size change
+
+A boolean map over the whole rank space (one byte per combination, ~8 MB)
+records which combinations are in the pool, so growing only has to draw
+the missing combinations and reject the ones already present. Shrinking
+drops rows. Number and pair counts are adjusted by the added or removed
+rows only.
+
+Uniform pools shrink by dropping a uniform random subset, which leaves a
+uniform sample. Weighted (history) pools are stored in the order they were
+drawn, and a prefix of a without-replacement weighted draw is itself such a
+draw, so they shrink by truncation and grow by continuing the draw.
+"""
+import numpy as np
+
+from lotto_cooccur import pair_counts
+from lotto_engine import (DRAW_CHUNK, EXACT_FRACTION, WEIGHTED_EXACT_FRACTION, _first_occurrences,
+                          number_counts, random_ranks, select_distinct_ranks, weighted_combinations)
+from lotto_rank import TOTAL_COMBINATIONS, rank_array, unrank_array
+
+# Past this change relative to the current size, rebuilding from scratch is cheaper
+MAX_RESIZE_FRACTION = 0.5
+
+
+def can_resize(current: int, target: int, weighted: bool = False) -> bool:
+    """Whether resizing a pool of `current` rows to `target` beats rebuilding it"""
+    if current == 0 or abs(target - current) > MAX_RESIZE_FRACTION * current:
+        return False
+    # Large weighted pools are built by Gumbel-top-k, which has no cheap continuation
+    return not (weighted and target > WEIGHTED_EXACT_FRACTION * TOTAL_COMBINATIONS)
+
+
+def presence_map(pool: np.ndarray) -> np.ndarray:
+    """Boolean map over all ranks, True for the combinations in `pool`"""
+    present = np.zeros(TOTAL_COMBINATIONS, dtype=bool)
+    for start in range(0, len(pool), DRAW_CHUNK):
+        present[rank_array(pool[start:start + DRAW_CHUNK])] = True
+    return present
+
+
+def missing_ranks(present: np.ndarray, count: int, rng: np.random.Generator, weights: np.ndarray = None) -> np.ndarray:
+    """`count` distinct ranks not marked in `present`, uniformly or weighted like the pool"""
+    free = TOTAL_COMBINATIONS - int(np.count_nonzero(present)) if weights is None else None
+    if weights is None and count > EXACT_FRACTION * free:
+        # Most of what is left is wanted: select exactly among the free ranks
+        candidates = np.flatnonzero(~present)
+        return candidates[select_distinct_ranks(count, len(candidates), rng)].astype(np.uint32)
+
+    if weights is not None:
+        probabilities = np.asarray(weights[1:], dtype=np.float64) / np.sum(weights[1:])
+    ranks = np.empty(0, dtype=np.uint32)
+    while len(ranks) < count:
+        batch = min(DRAW_CHUNK, 2 * (count - len(ranks)) + 64)
+        if weights is None:
+            drawn = random_ranks(batch, rng)
+        else:
+            drawn = rank_array(weighted_combinations(batch, probabilities, rng))
+        ranks = _first_occurrences(np.concatenate([ranks, drawn[~present[drawn]]]))
+    return ranks[:count]
+
+
+def resize_pool(pool, counts, pairs, present, sample_size: int, rng: np.random.Generator, weights=None):
+    """Grow or shrink `pool` to `sample_size` rows; returns updated (pool, counts, pairs, present).
+
+    `counts` is number_counts(pool) and `pairs` its pair counts (or None to
+    leave them uncomputed); `present` is its presence map, built here when
+    None. Inputs are not modified.
+    """
+    sample_size = max(0, min(sample_size, TOTAL_COMBINATIONS))
+    if present is None:
+        present = presence_map(pool)
+    present = present.copy()
+    counts = np.array(counts, copy=True)
+    pairs = None if pairs is None else np.array(pairs, copy=True)
+
+    if sample_size > len(pool):
+        ranks = missing_ranks(present, sample_size - len(pool), rng, weights)
+        changed = unrank_array(ranks)
+        present[ranks] = True
+        pool = np.concatenate([pool, changed])
+        sign = 1
+    else:
+        if weights is None:
+            drop = rng.choice(len(pool), size=len(pool) - sample_size, replace=False)
+        else:
+            drop = np.arange(sample_size, len(pool))
+        changed = np.asarray(pool[drop])
+        present[rank_array(changed)] = False
+        pool = np.delete(pool, drop, axis=0)
+        sign = -1
+
+    counts += sign * number_counts(changed)
+    if pairs is not None:
+        pairs += sign * pair_counts(changed)
+    return pool, counts, pairs, present
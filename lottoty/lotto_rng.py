@@ -0,0 +1,59 @@
+"""Seedable random number streams backed by numpy.random.Generator
+
+One root SeedSequence, optionally seeded from /config/, hands out
+independent child streams: one per request, worker or shard. Nothing
+shares interpreter-wide random state. With a fixed root seed, the n-th
+stream is always the same, so a run can be replayed.
+"""
+import threading
+
+import numpy as np
+
+BIT_GENERATORS = {
+    "pcg64": np.random.PCG64,
+    "philox": np.random.Philox
+}
+
+# Derived streams live under their own spawn-key prefix so they never
+# collide with the children handed out by `spawn`
+_DERIVED = 1 << 32
+
+
+def make_generator(seed=None, bit_generator: str = "pcg64") -> np.random.Generator:
+    """A Generator from an int, SeedSequence or None (fresh entropy)"""
+    return np.random.Generator(BIT_GENERATORS[bit_generator](seed))
+
+
+class RngSource:
+    """Root of all random streams used by the backend"""
+
+    def __init__(self, seed: int = None, bit_generator: str = "pcg64"):
+        self._lock = threading.Lock()
+        self.configure(seed, bit_generator)
+
+    def configure(self, seed: int = None, bit_generator: str = "pcg64"):
+        """Reset the root stream; the same seed replays the same sequence of streams"""
+        if bit_generator not in BIT_GENERATORS:
+            raise ValueError(f"Unknown bit generator {bit_generator!r}, expected one of {sorted(BIT_GENERATORS)}")
+        with self._lock:
+            self.seed = seed
+            self.bit_generator = bit_generator
+            self._root = np.random.SeedSequence(seed)
+
+    def spawn(self, count: int = 1) -> list:
+        """`count` independent child SeedSequences, e.g. one per worker"""
+        with self._lock:
+            return self._root.spawn(count)
+
+    def derive(self, *key: int) -> np.random.SeedSequence:
+        """A stream fixed by the root seed and `key` alone, regardless of prior spawns"""
+        return np.random.SeedSequence(self._root.entropy, spawn_key=(_DERIVED, *key))
+
+    def generator(self, seed: int = None) -> np.random.Generator:
+        """A fresh Generator: from `seed` when given, else the next child stream"""
+        if seed is None:
+            seed = self.spawn()[0]
+        return make_generator(seed, self.bit_generator)
+
+    def config(self) -> dict:
+        return {"seed": self.seed, "rng": self.bit_generator}
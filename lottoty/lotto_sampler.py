@@ -0,0 +1,77 @@
+"""Walker/Vose alias sampler for drawing lucky numbers by pool frequency"""
+import numpy as np
+
+from lotto_rank import NUMBERS, PICK
+
+
+class AliasSampler:
+    """O(1)-per-draw weighted sampler over the numbers 1..45.
+
+    The table is built once from a frequency mapping (number -> count) and
+    only needs rebuilding when those frequencies change.
+    """
+
+    def __init__(self, frequencies):
+        weights = np.zeros(NUMBERS, dtype=np.float64)
+        for num, freq in frequencies.items():
+            weights[int(num) - 1] = freq
+        total = weights.sum()
+        if total <= 0:
+            raise ValueError("Cannot build a sampler from empty frequencies")
+        self.support = int(np.count_nonzero(weights))
+
+        # Vose's method: split scaled weights into under- and over-full columns
+        scaled = weights * NUMBERS / total
+        self.prob = np.ones(NUMBERS, dtype=np.float64)
+        self.alias = np.arange(NUMBERS, dtype=np.intp)
+        small = [i for i in range(NUMBERS) if scaled[i] < 1.0]
+        large = [i for i in range(NUMBERS) if scaled[i] >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.prob[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Leftovers are full columns up to rounding error; prob stays 1.0
+
+    def draw(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """Draw `size` numbers (with replacement) as an array of 1..45"""
+        column = rng.integers(0, NUMBERS, size=size)
+        keep = rng.random(size) < self.prob[column]
+        return np.where(keep, column, self.alias[column]) + 1
+
+    def spin(self, rng: np.random.Generator, count: int = PICK) -> list:
+        """Draw `count` distinct numbers, each proportional to its weight among those left.
+
+        Duplicates are rejected, which is equivalent to sampling without
+        replacement. Candidates are drawn a small batch at a time, so the
+        cost doesn't depend on how large the pool behind the weights is.
+        """
+        if count > self.support:
+            raise ValueError(f"Only {self.support} numbers have a nonzero weight")
+        result = []
+        while len(result) < count:
+            for num in self.draw(4 * count, rng).tolist():
+                if num not in result:
+                    result.append(num)
+                    if len(result) == count:
+                        break
+        return result
+
+    def spin_batch(self, tickets: int, rng: np.random.Generator) -> np.ndarray:
+        """Vectorized `spin`: `tickets` rows of 6 distinct numbers as a sorted uint8 array.
+
+        Each column is drawn for every row at once, and only the entries that
+        repeat an earlier column are redrawn, so every row follows the same
+        distribution as a single `spin`.
+        """
+        if PICK > self.support:
+            raise ValueError(f"Only {self.support} numbers have a nonzero weight")
+        out = self.draw(tickets * PICK, rng).reshape(tickets, PICK)
+        for col in range(1, PICK):
+            repeated = (out[:, :col] == out[:, col:col + 1]).any(axis=1)
+            while repeated.any():
+                out[repeated, col] = self.draw(int(repeated.sum()), rng)
+                repeated = (out[:, :col] == out[:, col:col + 1]).any(axis=1)
+        out.sort(axis=1)
+        return out.astype(np.uint8)
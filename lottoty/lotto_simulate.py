@@ -0,0 +1,160 @@
+"""Monte Carlo backtesting of ticket strategies against winning draws
+
+Each simulated draw is played with K tickets per strategy: "biased" draws
+tickets the way /biased_spin/ does (alias sampler over the pool's number
+frequencies), "uniform" picks them uniformly. Draws are either synthetic
+(uniform) or taken from the recorded draw log. Work is split into batches
+of draws (or, when one draw has more than SIM_BATCH tickets, into parts of
+its tickets), each with its own RNG stream, and batches can run in worker
+processes; results are match-count histograms (0-6 hits) per strategy,
+reported as each batch completes.
+
+Usage: python lotto_simulate.py [--draws 10000] [--tickets 100] [--source synthetic|recorded]
+                                [--workers N] [--seed S] [--data-dir data]
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from lotto_engine import random_combinations
+from lotto_match import mask_hits, ticket_masks
+from lotto_rank import PICK
+from lotto_rng import make_generator
+from lotto_sampler import AliasSampler
+
+STRATEGIES = ("biased", "uniform")
+SIM_BATCH = 1 << 20  # Tickets per strategy per batch
+
+
+def count_hits(draws: np.ndarray, tickets: np.ndarray, per_draw: int) -> np.ndarray:
+    """Matches of each ticket with its draw; tickets[i] belongs to draws[i // per_draw]"""
+    return mask_hits(ticket_masks(tickets), np.repeat(ticket_masks(draws), per_draw))
+
+
+def simulate_batch(draws, count: int, per_draw: int, frequencies, seed, bit_generator: str = "pcg64") -> dict:
+    """Hit histograms per strategy for one batch; safe to run in a worker process.
+
+    `draws` is a (count, 6) array of winning numbers, or None to draw
+    `count` synthetic ones.
+    """
+    rng = make_generator(seed, bit_generator)
+    if draws is None:
+        draws = random_combinations(count, rng)
+    tickets = len(draws) * per_draw
+    generated = {
+        "biased": lambda: AliasSampler(frequencies).spin_batch(tickets, rng),
+        "uniform": lambda: random_combinations(tickets, rng)
+    }
+    return {
+        strategy: np.bincount(count_hits(draws, generated[strategy](), per_draw), minlength=PICK + 1)
+        for strategy in STRATEGIES
+    }
+
+
+def summarize(histograms: dict) -> dict:
+    results = {}
+    for strategy, hist in histograms.items():
+        tickets = int(hist.sum())
+        results[strategy] = {
+            "tickets": tickets,
+            "hits": [int(n) for n in hist],
+            "mean_hits": float(hist @ np.arange(PICK + 1) / tickets) if tickets else 0.0
+        }
+    return results
+
+
+def run_simulation(draws: int, tickets: int, frequencies, recorded: np.ndarray = None,
+                   workers: int = 1, seed=None, bit_generator: str = "pcg64"):
+    """Yield cumulative results after every completed batch; the last one has "done": True.
+
+    `recorded` is an (M, 6) array of winning numbers to play against; when
+    None, `draws` synthetic draws are used. Totals don't depend on the order
+    batches finish in, so a seeded run gives the same final result for any
+    worker count.
+    """
+    if recorded is not None:
+        draws = len(recorded)
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    per_part = min(max(tickets, 1), SIM_BATCH)
+    if tickets > per_part and recorded is None:
+        # A draw's tickets span several batches, which must all play the same draw
+        recorded = random_combinations(draws, make_generator(seed_seq.spawn(1)[0], bit_generator))
+    per_batch = max(1, SIM_BATCH // max(tickets, 1))
+    batches = [(start, part) for start in range(0, draws, per_batch) for part in range(0, max(tickets, 1), per_part)]
+    seeds = seed_seq.spawn(len(batches))
+    jobs = [
+        (None if recorded is None else recorded[start:start + per_batch],
+         min(per_batch, draws - start), min(per_part, tickets - part), frequencies, batch_seed, bit_generator)
+        for (start, part), batch_seed in zip(batches, seeds)
+    ]
+
+    totals = {strategy: np.zeros(PICK + 1, dtype=np.int64) for strategy in STRATEGIES}
+    done_draws = 0
+
+    def progress(batches_done):
+        return {
+            "batches": len(jobs),
+            "batches_done": batches_done,
+            "draws": done_draws,
+            "tickets_per_draw": tickets,
+            "done": batches_done == len(jobs),
+            "results": summarize(totals)
+        }
+
+    if workers <= 1 or len(jobs) <= 1:
+        completed = (simulate_batch(*job) for job in jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = [executor.submit(simulate_batch, *job) for job in jobs]
+        completed = (future.result() for future in as_completed(futures))
+    try:
+        for batches_done, histograms in enumerate(completed, 1):
+            for strategy, hist in histograms.items():
+                totals[strategy] += hist
+            done_draws = int(totals[STRATEGIES[0]].sum()) // max(tickets, 1)
+            yield progress(batches_done)
+        if not jobs:
+            yield progress(0)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    from lotto_drawlog import DrawLog
+    from lotto_store import load_pool
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--draws", type=int, default=10_000, help="synthetic draws (or the latest N recorded)")
+    parser.add_argument("--tickets", type=int, default=100, help="tickets per strategy per draw")
+    parser.add_argument("--source", choices=("synthetic", "recorded"), default="synthetic")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--data-dir", default="data", help="backend data directory (pool and draw log)")
+    args = parser.parse_args()
+
+    saved = load_pool(os.path.join(args.data_dir, "lucky_numbers.bin"))
+    if saved is None:
+        parser.error(f"no saved pool in {args.data_dir}; start the backend once to create it")
+    frequencies = saved[1]
+
+    recorded = None
+    if args.source == "recorded":
+        log = DrawLog(os.path.join(args.data_dir, "draws"))
+        recorded = log.read(len(log) - args.draws, len(log))["numbers"]
+        log.close()
+
+    for update in run_simulation(args.draws, args.tickets, frequencies, recorded, args.workers, args.seed):
+        print(f"\r{update['batches_done']}/{update['batches']} batches, {update['draws']} draws", end="", flush=True)
+    print()
+    print(f"{'strategy':>10} {'tickets':>12} {'mean hits':>10} " + " ".join(f"{f'{h} hits':>10}" for h in range(PICK + 1)))
+    for strategy, result in update["results"].items():
+        print(f"{strategy:>10} {result['tickets']:>12} {result['mean_hits']:>10.4f} "
+              + " ".join(f"{n:>10}" for n in result["hits"]))
+
+
+if __name__ == "__main__":
+    main()
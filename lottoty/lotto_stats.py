@@ -0,0 +1,149 @@
+"""Incrementally maintained statistics over recorded draws
+
+Each draw updates fixed-size structures in O(1): per-number counts and last
+seen draw id, a pair co-occurrence matrix, a triple co-occurrence cube and
+counts over a few sliding windows. Reads only look at these structures, so
+their cost doesn't grow with the history.
+"""
+from collections import deque
+from itertools import combinations
+
+import numpy as np
+
+from lotto_cooccur import pair_counts
+from lotto_rank import NUMBERS, PICK
+
+WINDOWS = (10, 100, 1000)  # Sliding windows (in draws) for hot/cold rankings
+
+_TRIPLES = np.array(list(combinations(range(PICK), 3)))
+
+
+class DrawStats:
+    """Frequencies, gaps, co-occurrence and hot/cold rankings for the draw log"""
+
+    def __init__(self, windows=WINDOWS):
+        size = NUMBERS + 1  # Index by number, 0 unused
+        self.total = 0
+        self.frequency = np.zeros(size, dtype=np.int64)
+        self.last_seen = np.full(size, -1, dtype=np.int64)
+        self.pairs = np.zeros((size, size), dtype=np.int64)
+        self.triples = np.zeros((size, size, size), dtype=np.int32)
+        self.windows = tuple(windows)
+        self.window_counts = {w: np.zeros(size, dtype=np.int64) for w in self.windows}
+        self._recent = deque(maxlen=max(self.windows) + 1)
+
+    def add(self, numbers):
+        """Account for one draw; constant time"""
+        numbers = sorted(set(numbers))
+        draw_id = self.total
+        self.total += 1
+        for n in numbers:
+            self.frequency[n] += 1
+            self.last_seen[n] = draw_id
+        for a, b in combinations(numbers, 2):
+            self.pairs[a, b] += 1
+            self.pairs[b, a] += 1
+        for a, b, c in combinations(numbers, 3):
+            self.triples[a, b, c] += 1
+        self._slide(numbers)
+
+    def add_many(self, draws: np.ndarray):
+        """Vectorized `add` for an (N, 6) array of draws, e.g. when replaying the log"""
+        if len(draws) == 0:
+            return
+        rows = np.sort(np.asarray(draws, dtype=np.int64), axis=1)
+        if (rows[:, 1:] == rows[:, :-1]).any():
+            # Rows with repeated numbers are rare; take the exact slow path
+            for row in rows.tolist():
+                self.add(row)
+            return
+        first_id = self.total
+        self.total += len(rows)
+
+        self.frequency += np.bincount(rows.ravel(), minlength=NUMBERS + 1)
+        ids = np.broadcast_to(np.arange(first_id, self.total)[:, None], rows.shape)
+        np.maximum.at(self.last_seen, rows.ravel(), ids.ravel())
+
+        self.pairs += pair_counts(rows)
+
+        size = NUMBERS + 1
+        a, b, c = (rows[:, _TRIPLES[:, i]] for i in range(3))
+        flat = np.bincount(((a * size + b) * size + c).ravel(), minlength=size ** 3)
+        self.triples += flat.reshape(size, size, size).astype(np.int32)
+
+        for row in rows[-self._recent.maxlen:].tolist():
+            self._slide(row)
+
+    def _slide(self, numbers):
+        self._recent.append(numbers)
+        for w, counts in self.window_counts.items():
+            counts[numbers] += 1
+            if len(self._recent) > w:
+                counts[self._recent[-w - 1]] -= 1
+
+    def number_stats(self) -> dict:
+        """Frequency, last seen draw id and gap (draws since last seen) per number"""
+        return {
+            n: {
+                "frequency": int(self.frequency[n]),
+                "last_seen": int(self.last_seen[n]) if self.last_seen[n] >= 0 else None,
+                "gap": int(self.total - 1 - self.last_seen[n]) if self.last_seen[n] >= 0 else None
+            }
+            for n in range(1, NUMBERS + 1)
+        }
+
+    def top_pairs(self, k: int) -> list:
+        upper = np.triu(self.pairs, 1)
+        return _top_entries(upper, k)
+
+    def top_triples(self, k: int) -> list:
+        return _top_entries(self.triples, k)
+
+    def hot_cold(self, window: int, k: int) -> dict:
+        """Most and least drawn numbers over the last `window` draws"""
+        counts = self.window_counts[window][1:]
+        hot = np.lexsort((np.arange(NUMBERS), -counts))[:k]  # Count desc, then number asc
+        cold = np.lexsort((np.arange(NUMBERS), counts))[:k]
+        return {
+            "draws": min(window, self.total),
+            "hot": [{"number": int(i) + 1, "count": int(counts[i])} for i in hot],
+            "cold": [{"number": int(i) + 1, "count": int(counts[i])} for i in cold]
+        }
+
+
+def _top_entries(counts: np.ndarray, k: int) -> list:
+    """The k largest nonzero cells of a count array, as numbers/count dicts"""
+    flat = counts.ravel()
+    k = min(k, int(np.count_nonzero(flat)))
+    if k == 0:
+        return []
+    top = np.argpartition(flat, -k)[-k:]
+    top = top[np.lexsort((top, -flat[top]))]  # Count desc, then numbers asc
+    return [
+        {"numbers": [int(i) for i in np.unravel_index(idx, counts.shape)], "count": int(flat[idx])}
+        for idx in top
+    ]
+
+
+def decayed_weights(segments, total: int, decay: float = 1.0, prior: float = 1.0) -> np.ndarray:
+    """Per-number weights from the whole draw history, older draws counting less.
+
+    `segments` yields (N, 6) draw arrays oldest first (as DrawLog.iter_numbers
+    does) and `total` is the number of draws across them. A draw `age` draws
+    before the latest contributes decay ** age to each of its numbers; with
+    decay 1 the weights are plain frequencies. `prior` is added to every
+    number so unseen numbers stay possible. Indexed by number, 0 unused.
+    """
+    weights = np.zeros(NUMBERS + 1, dtype=np.float64)
+    first_id = 0
+    for rows in segments:
+        # Clipped, so draws appended after `total` was taken count as newest
+        ages = np.maximum(total - 1 - np.arange(first_id, first_id + len(rows)), 0)
+        first_id += len(rows)
+        draw_weights = np.power(decay, ages, dtype=np.float64)
+        weights += np.bincount(
+            np.asarray(rows).ravel(), weights=np.repeat(draw_weights, PICK), minlength=NUMBERS + 1
+        )
+    weights[1:] += prior
+    weights[0] = 0
+    return weights
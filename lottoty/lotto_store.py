@@ -0,0 +1,97 @@
+"""Binary, memory-mappable persistence for the lucky numbers pool
+
+File layout (little endian):
+    magic      8s        b"LOTTOPL2"
+    sample     uint64    configured sample size
+    count      uint64    number of combinations stored
+    key_size   uint64    length of the key that follows
+    freqs      46*uint64 frequency of each number, index 0 unused
+    key        key_size  JSON list: the configuration the pool was drawn with
+    pool       count*6   uint8 rows, each combination sorted
+
+LOTTOPL1 files have no key_size or key fields and load with key None.
+"""
+import json
+import os
+import struct
+from collections import Counter
+
+import numpy as np
+
+from lotto_rank import NUMBERS, PICK
+
+MAGIC = b"LOTTOPL2"
+MAGIC_V1 = b"LOTTOPL1"
+_HEADER = struct.Struct(f"<8sQQQ{NUMBERS + 1}Q")
+_HEADER_V1 = struct.Struct(f"<8sQQ{NUMBERS + 1}Q")
+HEADER_SIZE = _HEADER.size
+
+
+def atomic_write(path: str, write):
+    """Call `write(file)` on a temp file, fsync it, then rename over `path`"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def pool_writer(pool: np.ndarray, frequencies, sample_size: int, key=None):
+    """Serialize the header now and return a `write(file)` callback for the pool.
+
+    `key` is a tuple of JSON-serializable values identifying how the pool
+    was drawn; loaders compare it before reusing the pool.
+    """
+    freqs = [0] * (NUMBERS + 1)
+    for num, freq in frequencies.items():
+        freqs[int(num)] = int(freq)
+    encoded_key = json.dumps(None if key is None else list(key)).encode()
+    header = _HEADER.pack(MAGIC, sample_size, len(pool), len(encoded_key), *freqs) + encoded_key
+
+    def write(f):
+        f.write(header)
+        f.write(np.ascontiguousarray(pool, dtype=np.uint8).tobytes())
+
+    return write
+
+
+def save_pool(path: str, pool: np.ndarray, frequencies, sample_size: int, key=None):
+    """Write the pool and its frequencies; readers never see a partial file"""
+    atomic_write(path, pool_writer(pool, frequencies, sample_size, key))
+
+
+def load_pool(path: str):
+    """Memory-map a saved pool.
+
+    Returns (pool, frequencies, sample_size, key), where pool is a read-only
+    (N, 6) uint8 memmap and key the tuple given to pool_writer (None when
+    unknown), or None if the file is missing or malformed.
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+            if header[:8] == MAGIC_V1:
+                _, sample_size, count, *freqs = _HEADER_V1.unpack_from(header)
+                key, offset = None, _HEADER_V1.size
+            elif header[:8] == MAGIC and len(header) == HEADER_SIZE:
+                _, sample_size, count, key_size, *freqs = _HEADER.unpack(header)
+                if key_size > size:
+                    return None
+                key = json.loads(f.read(key_size) or b"null")
+                key = None if key is None else tuple(key)
+                offset = HEADER_SIZE + key_size
+            else:
+                return None
+    except (OSError, ValueError, struct.error):
+        return None
+    if size != offset + count * PICK:
+        return None
+
+    if count:
+        pool = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(count, PICK))
+    else:
+        pool = np.empty((0, PICK), dtype=np.uint8)
+    frequencies = Counter({num: freqs[num] for num in range(1, NUMBERS + 1) if freqs[num]})
+    return pool, frequencies, sample_size, key
@@ -1,6 +1,5 @@
 from tkinter import *
 from PIL import Image, ImageTk
-import requests
 import random
 import time
 from tkinter import messagebox
@@ -12,19 +11,12 @@ import time
 import random
 import math  
 from tkinter import Tk, messagebox
+from lotto_client import BackendClient, Outbox, SpinPrefetcher
 
 
 def send_draw_to_backend(drawn_numbers):
-    try:
-        response = requests.post(
-            "http://127.0.0.1:8000/record/",
-            json={"numbers": drawn_numbers},
-            timeout=3
-        )
-        if response.status_code != 201:
-            print(f"Backend returned status {response.status_code}")
-    except Exception as e:
-        print(f"Failed to send draw to backend: {e}")
+    # Saved to the outbox first, so draws made while the backend is down are uploaded later
+    outbox.add(drawn_numbers)
 
 
 mixer.init()
@@ -37,6 +29,15 @@ except:
 window = Tk()
 window.title('Mega Lotto')
 
+# All backend calls run in the background; spins are fetched one ahead
+client = BackendClient(window)
+spins = SpinPrefetcher(
+    client,
+    lambda numbers: len(numbers) == 6 and all(isinstance(n, int) and 1 <= n <= 45 for n in numbers)
+)
+outbox = Outbox(client)
+shown_spin = {}  # Numbers on the reels with their pool frequencies, for "Show frequencies"
+
 try:
     icon_image = PhotoImage(file="image.png")
     window.iconphoto(True, icon_image)  
@@ -148,22 +149,25 @@ def update_sample_size():
                     messagebox.showerror("Error", "Sample size must be at least 1")
                     return
                 
-                # Send to backend
-                response = requests.post(
-                    "http://127.0.0.1:8000/config/",
-                    json={"sample_size": size},
-                    timeout=3
-                )
-                
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid number")
+                return
+
+            def updated(response):
                 if response.status_code == 200:
                     messagebox.showinfo("Success", f"Sample size updated to {size}")
-                    popup.destroy()
+                    if popup.winfo_exists():
+                        popup.destroy()
                 else:
                     messagebox.showerror("Error", f"Backend returned status {response.status_code}")
-            except ValueError:
-                messagebox.showerror("Error", "Please enter a valid number")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to update sample size: {str(e)}")
+
+            # Send to backend
+            client.post(
+                "/config/",
+                updated,
+                lambda e: messagebox.showerror("Error", f"Failed to update sample size: {str(e)}"),
+                json={"sample_size": size}
+            )
 
         Button(popup,
                text="Submit",
@@ -290,13 +294,25 @@ freq_button = Button(
 freq_button.place(x=100, y=420, width=200, height=40)
 
 def show_frequencies():
-    try:
-        response = requests.get("http://127.0.0.1:8000/lucky_numbers/")
-        if response.status_code != 200:
-            messagebox.showerror("Error", "Failed to get lucky number data")
-            return
+    # The backend's current spin is already the prefetched next one, so the
+    # numbers on the reels are described locally once there are any
+    if shown_spin:
+        display_frequencies(shown_spin)
+        return
+    client.get(
+        "/lucky_numbers/",
+        lucky_numbers_loaded,
+        lambda e: messagebox.showerror("Error", f"Failed to load frequency data: {str(e)}")
+    )
+
+def lucky_numbers_loaded(response):
+    if response.status_code != 200:
+        messagebox.showerror("Error", "Failed to get lucky number data")
+        return
+    display_frequencies(response.json())
 
-        data = response.json()
+def display_frequencies(data):
+    try:
         numbers = data.get("numbers", [])
         frequencies = data.get("frequencies", {})
         
@@ -589,9 +605,9 @@ def animate_numbers():
     spin_duration = 2
     stop_intervals = [200, 225, 250, 275, 300, 325]
 
-    # Get final numbers FIRST before animation starts
-    final_numbers = get_final_values()
-    print("Final numbers from API:", final_numbers)  # Debug print
+    # The spin arrives in the background; reels that stop before it use the fallback
+    final_numbers = []
+    settle = get_final_values(final_numbers)
 
     def spin_reel(reel_index):
         start_time = time.time()
@@ -610,6 +626,7 @@ def animate_numbers():
                 window.after(delay, update)
             else:
                 # Show final number when reel stops
+                settle(None)
                 labels[reel_index].config(text=str(final_numbers[reel_index]))
         
         update()
@@ -629,6 +646,7 @@ def animate_numbers():
             print(f"Sound error: {e}")
 
         # Update history and frequencies
+        settle(None)
         history.append(final_numbers)
         for num in final_numbers:
             frequency_data[num] = frequency_data.get(num, 0) + 1
@@ -655,24 +673,37 @@ def animate_numbers():
     # Schedule the final update
     window.after(int(spin_duration * 1000) + max(stop_intervals), update_reels)
 
-def get_final_values():
-    try:
-        response = requests.get("http://127.0.0.1:8000/biased_spin/", timeout=3)
-        if response.status_code == 200:
-            data = response.json()
-            # Updated to match your API's response structure
-            numbers = data.get('numbers', [])
-            if len(numbers) == 6 and all(isinstance(n, int) and 1 <= n <= 45 for n in numbers):
-                # Send the draw to your backend
-                send_draw_to_backend(numbers)
-                return numbers
-    except Exception as e:
-        print(f"API error: {e}")
-    
-    # Fallback: Generate 6 unique numbers between 1-45
-    fallback_numbers = sorted(random.sample(range(1, 46), 6))
-    send_draw_to_backend(fallback_numbers)
-    return fallback_numbers
+# Offline fallback draws use their own stream instead of the global random state
+FALLBACK_RNG = random.Random()
+
+def get_final_values(final_numbers):
+    """Fill `final_numbers` with the next spin and record it; returns `settle`.
+
+    A prefetched spin is used at once. Otherwise the spin in flight fills
+    the list when it arrives, unless `settle(None)` ran first because a
+    reel stopped: then 6 unique fallback numbers between 1-45 are used.
+    """
+    def settle(numbers):
+        if final_numbers:
+            return
+        if numbers is None:
+            numbers = sorted(FALLBACK_RNG.sample(range(1, 46), 6))
+        final_numbers.extend(numbers)
+        print("Final numbers:", final_numbers)
+        pool_frequencies = (spins.taken or {}).get("lucky_pool_frequencies", {})
+        shown_spin.clear()
+        shown_spin.update(
+            numbers=list(final_numbers),
+            frequencies={str(n): pool_frequencies.get(str(n), 0) for n in final_numbers}
+        )
+        send_draw_to_backend(final_numbers)
+
+    numbers = spins.take()
+    if numbers is not None:
+        settle(numbers)
+    else:
+        spins.when_ready(settle)
+    return settle
 
     
 frequency_data = {num: 0 for num in range(1, 46)}  # Tracks counts for numbers 1-45
@@ -716,5 +747,8 @@ for i in range(6):
 load_history()
 load_frequencies()
 update_history_display()
+spins.fetch()
+outbox.flush()  # Upload draws left over from a session the backend missed
 
 window.mainloop()
+client.close()